@@ -0,0 +1,65 @@
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+from commons import PaymentData, PaymentResponse
+
+
+@dataclass
+class AdmissionController:
+    """
+    Limits how many payments run at once and how many may wait for a slot.
+
+    A request beyond both limits, or one that waits longer than
+    queue_timeout, is rejected instead of piling up.
+    """
+
+    max_in_flight: int
+    max_queue_depth: int = 0
+    queue_timeout: Optional[float] = None
+    in_flight: int = field(default=0, init=False)
+    waiting: int = field(default=0, init=False)
+    rejected: int = field(default=0, init=False)
+    _condition: threading.Condition = field(
+        default_factory=threading.Condition, init=False
+    )
+
+    def __post_init__(self):
+        if self.max_in_flight < 1:
+            raise ValueError("max_in_flight debe ser positivo")
+
+    def try_acquire(self) -> bool:
+        with self._condition:
+            if self.in_flight < self.max_in_flight:
+                self.in_flight += 1
+                return True
+            if self.waiting >= self.max_queue_depth:
+                self.rejected += 1
+                return False
+            self.waiting += 1
+            try:
+                admitted = self._condition.wait_for(
+                    lambda: self.in_flight < self.max_in_flight,
+                    timeout=self.queue_timeout,
+                )
+            finally:
+                self.waiting -= 1
+            if not admitted:
+                self.rejected += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify()
+
+    @staticmethod
+    def throttled_response(payment_data: PaymentData) -> PaymentResponse:
+        return PaymentResponse(
+            status="throttled",
+            amount=payment_data.amount,
+            transaction_id=None,
+            message="Too many payments in flight, try again later",
+        )
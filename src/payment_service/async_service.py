@@ -0,0 +1,107 @@
+import asyncio
+from dataclasses import dataclass
+from typing import Optional, Self
+
+from commons import CustomerData, PaymentData, PaymentResponse, Request
+from loggers import TransactionLogger
+from notifiers import AsyncNotifierProtocol
+from processors import (
+    AsyncPaymentProcessorProtocol,
+    AsyncRecurringPaymentProcessorProtocol,
+    AsyncRefundProcessorProtocol,
+)
+from factory import PaymentProcessorFactory
+
+
+from listeners import ListenersManager
+from validators import ChainHandler
+
+
+@dataclass
+class AsyncPaymentService:
+    """
+    Asyncio counterpart of PaymentService.
+
+    Processors and notifiers are awaited, validators and listeners run
+    inline and the logger runs in the default executor so a slow disk does
+    not block the event loop.
+    """
+
+    payment_processor: AsyncPaymentProcessorProtocol
+    notifier: AsyncNotifierProtocol
+    validators: ChainHandler
+    logger: TransactionLogger
+    listeners: ListenersManager
+    refund_processor: Optional[AsyncRefundProcessorProtocol] = None
+    recurring_processor: Optional[AsyncRecurringPaymentProcessorProtocol] = (
+        None
+    )
+
+    @classmethod
+    def create_with_payment_processor(
+        cls, payment_data: PaymentData, **kwargs
+    ) -> Self:
+        try:
+            processor = PaymentProcessorFactory.create_async_payment_processor(
+                payment_data
+            )
+            return cls(payment_processor=processor, **kwargs)
+        except ValueError as e:
+            print("Error creando la clase")
+            raise e
+
+    async def process_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        try:
+            request = Request(
+                customer_data=customer_data, payment_data=payment_data
+            )
+            self.validators.handle(request=request)
+
+        except Exception as e:
+            print(f"fallo en las validaciones: {e}")
+            raise e
+        payment_response = await self.payment_processor.process_transaction(
+            customer_data, payment_data
+        )
+        self.listeners.notifyAll(
+            f"pago exitoso al evento: {payment_response.transaction_id}"
+        )
+        await self.notifier.send_confirmation(customer_data)
+        await asyncio.to_thread(
+            self.logger.log_transaction,
+            customer_data,
+            payment_data,
+            payment_response,
+        )
+        return payment_response
+
+    async def process_refund(self, transaction_id: str):
+        if not self.refund_processor:
+            raise Exception("this processor does not support refunds")
+        refund_response = await self.refund_processor.refund_payment(
+            transaction_id
+        )
+        await asyncio.to_thread(
+            self.logger.log_refund, transaction_id, refund_response
+        )
+        return refund_response
+
+    async def setup_recurring(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ):
+        if not self.recurring_processor:
+            raise Exception("this processor does not support recurring")
+        recurring_response = (
+            await self.recurring_processor.setup_recurring_payment(
+                customer_data, payment_data
+            )
+        )
+        await asyncio.to_thread(
+            self.logger.log_transaction,
+            customer_data,
+            payment_data,
+            recurring_response,
+        )
+        return recurring_response
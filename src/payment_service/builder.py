@@ -1,7 +1,11 @@
+import threading
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import Optional, Self
+from typing import ClassVar, Optional, Self
 
 from service import PaymentService
+from side_effects import DeferredSideEffects
+from admission import AdmissionController
 from commons import PaymentData, CustomerData
 from loggers import TransactionLogger
 from notifiers import NotifierProtocol, EmailNotifier, SMSNotifier
@@ -30,9 +34,60 @@ class PaymentServiceBuilder:
     listener: Optional[ListenersManager] = None
     refund_processor: Optional[RefundProcessorProtocol] = None
     recurring_processor: Optional[RecurringPaymentProcessorProtocol] = None
+    executor: Optional[Executor] = None
+    side_effects: Optional[DeferredSideEffects] = None
+    admission: Optional[AdmissionController] = None
 
-    def set_logger(self) -> Self:
-        self.logger = TransactionLogger()
+    _templates: ClassVar[dict[tuple[type, type], "PaymentServiceBuilder"]] = {}
+    _templates_lock: ClassVar[threading.Lock] = threading.Lock()
+
+    @classmethod
+    def build_for(
+        cls, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentService:
+        """
+        Builds a service for a payment reusing cached, pre-wired components.
+
+        Components are cached per (processor type, notifier type), so every
+        service built from the same template shares the same processor,
+        notifier, validators, logger and listeners.
+        """
+        key = (
+            PaymentProcessorFactory.resolve_processor_type(payment_data),
+            cls.resolve_notifier_type(customer_data),
+        )
+        template = cls._templates.get(key)
+        if template is None:
+            template = (
+                cls()
+                .set_logger()
+                .set_payment_processor(payment_data)
+                .set_chain_of_validations()
+                .set_notifier(customer_data)
+                .set_listeners()
+            )
+            with cls._templates_lock:
+                template = cls._templates.setdefault(key, template)
+        return template.build()
+
+    @classmethod
+    def clear_templates(cls):
+        with cls._templates_lock:
+            cls._templates.clear()
+
+    @staticmethod
+    def resolve_notifier_type(
+        customer_data: CustomerData,
+    ) -> type[NotifierProtocol]:
+        if customer_data.contact_info.email:
+            return EmailNotifier
+        if customer_data.contact_info.phone:
+            return SMSNotifier
+
+        raise ValueError("No se puede seleccionar clase de notificación")
+
+    def set_logger(self, logger: Optional[TransactionLogger] = None) -> Self:
+        self.logger = logger or TransactionLogger()
         return self
 
     def set_payment_processor(self, payment_data: PaymentData) -> Self:
@@ -41,6 +96,33 @@ class PaymentServiceBuilder:
         )
         return self
 
+    def set_executor(self) -> Self:
+        if not self.payment_processor:
+            raise ValueError("Debe seleccionar el procesador antes del pool")
+        self.executor = PaymentProcessorFactory.get_executor(
+            self.payment_processor
+        )
+        return self
+
+    def set_deferred_side_effects(
+        self, side_effects: Optional[DeferredSideEffects] = None
+    ) -> Self:
+        self.side_effects = (side_effects or DeferredSideEffects()).start()
+        return self
+
+    def set_admission_control(
+        self,
+        max_in_flight: int,
+        max_queue_depth: int = 0,
+        queue_timeout: Optional[float] = None,
+    ) -> Self:
+        self.admission = AdmissionController(
+            max_in_flight=max_in_flight,
+            max_queue_depth=max_queue_depth,
+            queue_timeout=queue_timeout,
+        )
+        return self
+
     def set_chain_of_validations(self) -> Self:
         customer_handler = CustomerHandler()
         customer_handler_2 = CustomerHandler()
@@ -51,14 +133,12 @@ class PaymentServiceBuilder:
         return self
 
     def set_notifier(self, customer_data: CustomerData) -> Self:
-        if customer_data.contact_info.email:
+        if self.resolve_notifier_type(customer_data) is EmailNotifier:
             self.notifier = EmailNotifier()
             return self
-        if customer_data.contact_info.phone:
-            self.notifier = SMSNotifier(gateway="MyCustomGateway")
-            return self
 
-        raise ValueError("No se puede seleccionar clase de notificación")
+        self.notifier = SMSNotifier(gateway="MyCustomGateway")
+        return self
 
     def set_listeners(self) -> Self:
         listener = ListenersManager()
@@ -96,4 +176,7 @@ class PaymentServiceBuilder:
             notifier=self.notifier,
             logger=self.logger,
             listeners=self.listener,
+            executor=self.executor,
+            side_effects=self.side_effects,
+            admission=self.admission,
         )
@@ -1,3 +1,4 @@
+from .batch_response import BatchResponse
 from .contact import ContactInfo
 from .customer import CustomerData
 from .payment_data import PaymentData, PaymentType
@@ -5,6 +6,7 @@ from .payment_response import PaymentResponse
 from .request import Request
 
 __all__ = [
+    "BatchResponse",
     "ContactInfo",
     "CustomerData",
     "PaymentData",
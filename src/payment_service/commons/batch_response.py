@@ -0,0 +1,24 @@
+from pydantic import BaseModel, Field
+
+from .payment_response import PaymentResponse
+
+
+class BatchResponse(BaseModel):
+    responses: list[PaymentResponse] = Field(default_factory=list)
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    queued: int = 0
+    amount_processed: int = 0
+
+    def add(self, response: PaymentResponse):
+        self.responses.append(response)
+        self.total += 1
+        if response.status in ("failed", "throttled"):
+            self.failed += 1
+        elif response.status == "queued":
+            # Accepted during failover, but not charged yet.
+            self.queued += 1
+        else:
+            self.succeeded += 1
+            self.amount_processed += response.amount
@@ -1,8 +1,15 @@
-from typing import Protocol
+import os
+from concurrent.futures import Future
+from typing import Iterable, Optional, Protocol
 from service_protocol import PaymentServiceProtocol
 
 
-from commons import CustomerData, PaymentData, PaymentResponse
+from commons import (
+    BatchResponse,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+)
 
 
 class PaymentServiceDecoratorProtocol(Protocol):
@@ -12,8 +19,24 @@ class PaymentServiceDecoratorProtocol(Protocol):
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse: ...
 
+    def submit_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]: ...
+
+    def process_batch(
+        self, payments: Iterable[tuple[CustomerData, PaymentData]]
+    ) -> BatchResponse: ...
+
     def process_refund(self, transaction_id: str): ...
 
+    def process_refunds(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str | os.PathLike] = None,
+    ) -> BatchResponse: ...
+
     def setup_recurring(
         self, customer_data: CustomerData, payment_data: PaymentData
     ): ...
@@ -1,28 +1,142 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import ClassVar
+
 from commons import PaymentData, PaymentType
 
 from processors import (
+    AsyncPaymentProcessorAdapter,
+    AsyncPaymentProcessorProtocol,
+    AsyncStripePaymentProcessor,
+    CircuitBreaker,
+    CircuitBreakerProcessor,
     PaymentProcessorProtocol,
     OfflinePaymentProcessor,
     StripePaymentProcessor,
     LocalPaymentProcessor,
+    async_http_available,
 )
 
 
 class PaymentProcessorFactory:
+    pool_sizes: ClassVar[dict[type, int]] = {
+        StripePaymentProcessor: 32,
+        LocalPaymentProcessor: 8,
+        OfflinePaymentProcessor: 4,
+    }
+    default_pool_size: ClassVar[int] = 8
+    guarded_types: ClassVar[set[type]] = {StripePaymentProcessor}
+    _executors: ClassVar[dict[type, ThreadPoolExecutor]] = {}
+    _executors_lock: ClassVar[threading.Lock] = threading.Lock()
+    _guarded: ClassVar[dict[type, CircuitBreakerProcessor]] = {}
+    _guarded_lock: ClassVar[threading.Lock] = threading.Lock()
+
     @staticmethod
     def create_payment_processor(
         payment_data: PaymentData,
     ) -> PaymentProcessorProtocol:
+        processor_type = PaymentProcessorFactory.resolve_processor_type(
+            payment_data
+        )
+        if processor_type in PaymentProcessorFactory.guarded_types:
+            return PaymentProcessorFactory.get_guarded_processor(
+                processor_type
+            )
+        return processor_type()
+
+    @classmethod
+    def get_guarded_processor(
+        cls, processor_type: type[PaymentProcessorProtocol]
+    ) -> CircuitBreakerProcessor:
+        """
+        Returns the circuit-breaker-wrapped processor shared by every
+        payment of that type, failing over to OfflinePaymentProcessor.
+
+        Payments queued during failover are kept in
+        queued_<processor type>.jsonl, so a restart does not lose them. The
+        file is locked on every change, so the processes started from the
+        same directory, such as shard workers, share one queue.
+        """
+        with cls._guarded_lock:
+            processor = cls._guarded.get(processor_type)
+            if processor is None:
+                processor = CircuitBreakerProcessor(
+                    wrapped=processor_type(),
+                    breaker=CircuitBreaker(name=processor_type.__name__),
+                    fallback=OfflinePaymentProcessor(),
+                    queue_path=f"queued_{processor_type.__name__}.jsonl",
+                )
+                cls._guarded[processor_type] = processor
+            return processor
+
+    @staticmethod
+    def resolve_processor_type(
+        payment_data: PaymentData,
+    ) -> type[PaymentProcessorProtocol]:
         match payment_data.type:
             case PaymentType.OFFLINE:
-                return OfflinePaymentProcessor()
+                return OfflinePaymentProcessor
 
             case PaymentType.ONLINE:
                 match payment_data.currency:
                     case "USD":
-                        return StripePaymentProcessor()
+                        return StripePaymentProcessor
                     case _:
-                        return LocalPaymentProcessor()
+                        return LocalPaymentProcessor
 
             case _:
                 raise ValueError("No se Soporta este tipo de pago")
+
+    @staticmethod
+    def create_async_payment_processor(
+        payment_data: PaymentData,
+    ) -> AsyncPaymentProcessorProtocol:
+        """
+        Returns the async processor for the payment. Stripe payments use
+        the native async client when httpx is installed and run the sync
+        processor in threads otherwise.
+        """
+        processor_type = PaymentProcessorFactory.resolve_processor_type(
+            payment_data
+        )
+        if processor_type is StripePaymentProcessor and async_http_available():
+            return AsyncStripePaymentProcessor()
+        return AsyncPaymentProcessorAdapter(wrapped=processor_type())
+
+    @classmethod
+    def set_pool_size(cls, processor_type: type, size: int):
+        """
+        Sets the number of worker threads for a processor type.
+
+        An executor already created for that type is shut down once its
+        pending work finishes and a new one is created on the next request.
+        """
+        if size < 1:
+            raise ValueError("El tamaño del pool debe ser positivo")
+        with cls._executors_lock:
+            cls.pool_sizes[processor_type] = size
+            executor = cls._executors.pop(processor_type, None)
+        if executor:
+            executor.shutdown(wait=False)
+
+    @classmethod
+    def get_executor(
+        cls, processor: PaymentProcessorProtocol
+    ) -> ThreadPoolExecutor:
+        """
+        Returns the bounded thread pool shared by every processor of the
+        same type. Wrapped processors use the pool of the processor they
+        wrap.
+        """
+        processor_type = type(getattr(processor, "wrapped", processor))
+        with cls._executors_lock:
+            executor = cls._executors.get(processor_type)
+            if executor is None:
+                executor = ThreadPoolExecutor(
+                    max_workers=cls.pool_sizes.get(
+                        processor_type, cls.default_pool_size
+                    ),
+                    thread_name_prefix=processor_type.__name__,
+                )
+                cls._executors[processor_type] = executor
+            return executor
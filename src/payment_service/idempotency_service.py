@@ -0,0 +1,165 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+from decorator_protocol import PaymentServiceDecoratorProtocol
+from service_protocol import PaymentServiceProtocol
+
+
+from commons import (
+    BatchResponse,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+    Request,
+)
+
+
+class IdempotencyKeyMismatch(ValueError):
+    """Raised when an idempotency key is reused for a different payment."""
+
+
+@dataclass
+class PaymentServiceIdempotency(PaymentServiceDecoratorProtocol):
+    """
+    Deduplicates payments by idempotency key.
+
+    Concurrent submissions with the same key share the result of the first
+    one. Completed responses are kept for ttl seconds when the caller
+    supplied the key. Keys derived from the request only coalesce while
+    the first payment is in flight unless derived_key_ttl is set, so two
+    genuine identical payments are not merged. As in Stripe, reusing a
+    key for a different customer or payment raises IdempotencyKeyMismatch.
+
+    Only process_transaction is deduplicated; the other calls, including
+    submit_transaction and process_batch, go straight to the wrapped
+    service.
+    """
+
+    wrapped: PaymentServiceProtocol
+    ttl: float = 24 * 60 * 60
+    derived_key_ttl: float = 0
+    max_entries: int = 100_000
+    _in_flight: dict[str, tuple[str, Future]] = field(
+        default_factory=dict, init=False
+    )
+    _completed: OrderedDict[str, tuple[float, str, PaymentResponse]] = field(
+        default_factory=OrderedDict, init=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    @staticmethod
+    def request_key(
+        customer_data: CustomerData, payment_data: PaymentData
+    ) -> str:
+        request = Request(
+            customer_data=customer_data, payment_data=payment_data
+        )
+        return hashlib.sha256(request.model_dump_json().encode()).hexdigest()
+
+    def process_transaction(
+        self,
+        customer_data: CustomerData,
+        payment_data: PaymentData,
+        idempotency_key: Optional[str] = None,
+    ) -> PaymentResponse:
+        ttl = self.ttl if idempotency_key else self.derived_key_ttl
+        fingerprint = self.request_key(customer_data, payment_data)
+        key = idempotency_key or fingerprint
+
+        with self._lock:
+            cached = self._get_completed(key, fingerprint)
+            if cached:
+                print(f"Respuesta reutilizada para la llave {key}")
+                return cached
+            in_flight = self._in_flight.get(key)
+            owner = in_flight is None
+            if owner:
+                future: Future[PaymentResponse] = Future()
+                self._in_flight[key] = (fingerprint, future)
+            else:
+                self._check_fingerprint(key, in_flight[0], fingerprint)
+                future = in_flight[1]
+
+        if not owner:
+            print(f"Esperando el pago en curso con la llave {key}")
+            return future.result()  # type: ignore
+
+        try:
+            response = self.wrapped.process_transaction(
+                customer_data, payment_data
+            )
+        except Exception as e:
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(e)  # type: ignore
+            raise e
+
+        with self._lock:
+            del self._in_flight[key]
+            if ttl > 0 and response.status not in ("failed", "throttled"):
+                self._store_completed(key, fingerprint, response, ttl)
+        future.set_result(response)  # type: ignore
+        return response
+
+    def submit_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]:
+        return self.wrapped.submit_transaction(customer_data, payment_data)
+
+    def process_batch(
+        self, payments: Iterable[tuple[CustomerData, PaymentData]]
+    ) -> BatchResponse:
+        return self.wrapped.process_batch(payments)
+
+    def process_refund(self, transaction_id: str):
+        return self.wrapped.process_refund(transaction_id)
+
+    def process_refunds(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str | os.PathLike] = None,
+    ) -> BatchResponse:
+        return self.wrapped.process_refunds(
+            transaction_ids, max_workers, chunk_size, checkpoint_path
+        )
+
+    def setup_recurring(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ):
+        return self.wrapped.setup_recurring(customer_data, payment_data)
+
+    def _get_completed(
+        self, key: str, fingerprint: str
+    ) -> Optional[PaymentResponse]:
+        entry = self._completed.get(key)
+        if not entry:
+            return None
+        expires_at, stored_fingerprint, response = entry
+        if expires_at < time.monotonic():
+            del self._completed[key]
+            return None
+        self._check_fingerprint(key, stored_fingerprint, fingerprint)
+        return response
+
+    def _store_completed(
+        self, key: str, fingerprint: str, response: PaymentResponse, ttl: float
+    ):
+        self._completed[key] = (time.monotonic() + ttl, fingerprint, response)
+        self._completed.move_to_end(key)
+        while len(self._completed) > self.max_entries:
+            self._completed.popitem(last=False)
+
+    @staticmethod
+    def _check_fingerprint(key: str, expected: str, fingerprint: str):
+        if fingerprint != expected:
+            raise IdempotencyKeyMismatch(
+                f"La llave {key} ya se usó con otro pago"
+            )
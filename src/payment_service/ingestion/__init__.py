@@ -0,0 +1,4 @@
+from .readers import read_csv, read_jsonl, read_records
+from .records import parse_record
+
+__all__ = ["read_csv", "read_jsonl", "read_records", "parse_record"]
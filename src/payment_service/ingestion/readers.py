@@ -0,0 +1,28 @@
+import csv
+import os
+from typing import Iterator
+
+
+def read_jsonl(path: str | os.PathLike) -> Iterator[str]:
+    """
+    Yields each non-empty line of a JSONL file undecoded, so a malformed
+    line fails only its own record.
+    """
+    with open(path, encoding="utf-8") as records_file:
+        for line in records_file:
+            if line.strip():
+                yield line
+
+
+def read_csv(path: str | os.PathLike) -> Iterator[dict]:
+    """
+    Yields one record per row of a CSV file with a header row.
+    """
+    with open(path, encoding="utf-8", newline="") as records_file:
+        yield from csv.DictReader(records_file)
+
+
+def read_records(path: str | os.PathLike) -> Iterator[str | dict]:
+    if os.fspath(path).endswith(".csv"):
+        return read_csv(path)
+    return read_jsonl(path)
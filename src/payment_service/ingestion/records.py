@@ -0,0 +1,31 @@
+from commons import ContactInfo, CustomerData, PaymentData
+
+
+def parse_record(record: dict) -> tuple[CustomerData, PaymentData]:
+    """
+    Builds the customer and payment models of a single record.
+
+    Accepts either nested records with "customer_data" and "payment_data"
+    keys or flat records (name, email, phone, customer_id, amount, source,
+    currency, type) as found in CSV files.
+    """
+    if "customer_data" in record:
+        return (
+            CustomerData.model_validate(record["customer_data"]),
+            PaymentData.model_validate(record["payment_data"]),
+        )
+
+    customer_data = CustomerData(
+        name=record["name"],
+        contact_info=ContactInfo(
+            email=record.get("email") or None,
+            phone=record.get("phone") or None,
+        ),
+        customer_id=record.get("customer_id") or None,
+    )
+    payment_fields = {
+        key: record[key]
+        for key in ("amount", "source", "currency", "type")
+        if record.get(key)
+    }
+    return customer_data, PaymentData.model_validate(payment_fields)
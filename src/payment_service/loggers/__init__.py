@@ -1,3 +1,26 @@
+from .index import IndexEntry, TransactionIndex
+from .record import LogRecord
+from .record_format import RecordFormat
 from .transaction import TransactionLogger
 
-__all__ = ["TransactionLogger"]
+from .async_writer import AsyncTransactionLogger, LogWriterStats
+from .binary_format import BinaryFormat
+from .buffered import BufferedTransactionLogger
+from .jsonl_format import JsonLinesFormat
+from .segmented import SegmentedTransactionLogger
+from .text_format import TextFormat
+
+__all__ = [
+    "TransactionLogger",
+    "BufferedTransactionLogger",
+    "AsyncTransactionLogger",
+    "LogWriterStats",
+    "SegmentedTransactionLogger",
+    "LogRecord",
+    "RecordFormat",
+    "TextFormat",
+    "JsonLinesFormat",
+    "BinaryFormat",
+    "TransactionIndex",
+    "IndexEntry",
+]
@@ -0,0 +1,166 @@
+import atexit
+import threading
+from dataclasses import dataclass, field
+from queue import Empty, Full, Queue
+from typing import Iterator, Optional, Self
+
+from .buffered import BufferedTransactionLogger
+from .record import LogRecord
+from .transaction import EncodedRecord, TransactionLogger
+
+OVERFLOW_POLICIES = ("block", "drop")
+
+_STOP = object()
+
+
+@dataclass
+class LogWriterStats:
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    overflows: int = 0
+    write_errors: int = 0
+
+
+@dataclass
+class AsyncTransactionLogger(TransactionLogger):
+    """
+    Transaction logger that hands records to a dedicated writer thread.
+
+    Records are encoded on the caller's thread and put on a bounded queue;
+    the writer drains it in batches into sink, so a slow disk never stalls
+    the payment path. When the queue is full, the "block" policy waits up
+    to block_timeout for room (forever if None) and "drop" discards the
+    record; both count an overflow, and discarded records are counted as
+    dropped.
+    """
+
+    sink: Optional[TransactionLogger] = None
+    max_queue: int = 10_000
+    overflow: str = "block"
+    block_timeout: Optional[float] = None
+    max_batch: int = 1_000
+    stats: LogWriterStats = field(default_factory=LogWriterStats, init=False)
+    _queue: Queue = field(init=False)
+    _stats_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+    _thread: Optional[threading.Thread] = field(default=None, init=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Política de desborde desconocida: {self.overflow}"
+            )
+        if self.sink is None:
+            self.sink = BufferedTransactionLogger(
+                path=self.path,
+                record_format=self.record_format,
+                index=self.index,
+                max_delay=0,
+            )
+        self._queue = Queue(maxsize=self.max_queue)
+        self._thread = threading.Thread(
+            target=self._run, name="transaction-log-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def flush(self):
+        """
+        Blocks until every queued record has been handed to the sink and
+        the sink has committed it.
+        """
+        self._queue.join()
+        if self.sink:
+            self.sink.flush()
+
+    def read_records(self) -> Iterator[LogRecord]:
+        self.flush()
+        if self.sink:
+            yield from self.sink.read_records()
+
+    def find_transaction(self, transaction_id: str) -> Optional[LogRecord]:
+        self.flush()
+        if not self.sink:
+            return None
+        return self.sink.find_transaction(transaction_id)
+
+    def close(self):
+        if not self._thread:
+            return
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        if self.sink:
+            self.sink.close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _write(self, records: list[EncodedRecord]):
+        if not self._thread:
+            raise ValueError("El registro de transacciones está cerrado")
+        try:
+            self._queue.put_nowait(records)
+        except Full:
+            self._count("overflows")
+            if self.overflow == "drop":
+                self._count("dropped", len(records))
+                return
+            try:
+                self._queue.put(records, timeout=self.block_timeout)
+            except Full:
+                self._count("dropped", len(records))
+                return
+        self._count("enqueued", len(records))
+
+    def _count(self, counter: str, value: int = 1):
+        with self._stats_lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + value)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+            stop = any(item is _STOP for item in batch)
+            records = [
+                record
+                for item in batch
+                if item is not _STOP
+                for record in item
+            ]
+            try:
+                self._write_batch(records)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if stop:
+                break
+
+    def _write_batch(self, records: list[EncodedRecord]):
+        if not records or not self.sink:
+            return
+        try:
+            self.sink._write(records)
+            if self._queue.empty():
+                self.sink.flush()
+        except Exception as e:
+            # The writer must outlive any sink failure, or callers blocked
+            # on a full queue would wait forever.
+            print(f"No se pudo escribir el registro: {e}")
+            self._count("write_errors")
+            return
+        self._count("written", len(records))
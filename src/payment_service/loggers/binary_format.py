@@ -0,0 +1,100 @@
+import struct
+from typing import BinaryIO, Iterator, Optional
+
+from .record import LogRecord
+from .record_format import RecordFormat
+
+VERSION = 1
+KINDS = ("payment", "refund")
+
+# Record length, version, kind, timestamp and amount, followed by the
+# string fields, each prefixed with its length.
+_HEADER = struct.Struct("<IBBdq")
+_RECORD_LENGTH = struct.Struct("<I")
+_LENGTH = struct.Struct("<H")
+_NONE = 0xFFFF
+_MAX_LENGTH = _NONE - 1
+
+
+class BinaryFormat(RecordFormat):
+    """
+    Compact length-prefixed binary records.
+
+    Every record starts with its total length, so readers can skip
+    records without parsing them. Strings longer than 65534 bytes are
+    truncated.
+    """
+
+    def encode(self, record: LogRecord) -> bytes:
+        strings = b"".join(
+            self._encode_string(value)
+            for value in (
+                record.transaction_id,
+                record.reference_id,
+                record.customer_name,
+                record.status,
+                record.message,
+            )
+        )
+        return (
+            _HEADER.pack(
+                _HEADER.size + len(strings),
+                VERSION,
+                KINDS.index(record.kind),
+                record.timestamp,
+                record.amount,
+            )
+            + strings
+        )
+
+    def decode(self, data: bytes) -> Iterator[LogRecord]:
+        offset = 0
+        while offset < len(data):
+            length, version, kind, timestamp, amount = _HEADER.unpack_from(
+                data, offset
+            )
+            if version != VERSION:
+                raise ValueError(f"Versión de registro desconocida: {version}")
+            position = offset + _HEADER.size
+            strings = []
+            for _ in range(5):
+                value, position = self._decode_string(data, position)
+                strings.append(value)
+            transaction_id, reference_id, customer_name, status, message = (
+                strings
+            )
+            yield LogRecord(
+                kind=KINDS[kind],
+                timestamp=timestamp,
+                status=status or "",
+                amount=amount,
+                message=message,
+                transaction_id=transaction_id,
+                reference_id=reference_id,
+                customer_name=customer_name,
+            )
+            offset += length
+
+    def read(self, log_file: BinaryIO) -> Iterator[LogRecord]:
+        while prefix := log_file.read(_RECORD_LENGTH.size):
+            (length,) = _RECORD_LENGTH.unpack(prefix)
+            record = prefix + log_file.read(length - _RECORD_LENGTH.size)
+            yield from self.decode(record)
+
+    @staticmethod
+    def _encode_string(value: Optional[str]) -> bytes:
+        if value is None:
+            return _LENGTH.pack(_NONE)
+        encoded = value.encode()[:_MAX_LENGTH]
+        return _LENGTH.pack(len(encoded)) + encoded
+
+    @staticmethod
+    def _decode_string(
+        data: bytes, position: int
+    ) -> tuple[Optional[str], int]:
+        (length,) = _LENGTH.unpack_from(data, position)
+        position += _LENGTH.size
+        if length == _NONE:
+            return None, position
+        end = position + length
+        return data[position:end].decode(errors="replace"), end
@@ -0,0 +1,122 @@
+import atexit
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO, Optional, Self
+
+from .index import IndexEntry
+from .transaction import EncodedRecord, TransactionLogger
+
+DURABILITY_POLICIES = ("none", "flush", "fsync")
+
+
+@dataclass
+class BufferedTransactionLogger(TransactionLogger):
+    """
+    Transaction logger that keeps the log open and commits records in
+    groups.
+
+    Records are buffered in memory and written with one write() once
+    max_buffer_bytes are pending or max_delay seconds have passed. The
+    durability policy decides what a commit waits for: "none" leaves the
+    data in the file object's buffer, "flush" hands it to the OS and
+    "fsync" waits until it is on disk. flush() commits right away and
+    close() commits and closes the file.
+    """
+
+    max_buffer_bytes: int = 64 * 1024
+    max_delay: float = 0.2
+    durability: str = "flush"
+    _buffer: list[EncodedRecord] = field(default_factory=list, init=False)
+    _buffered_bytes: int = field(default=0, init=False)
+    _file: Optional[BinaryIO] = field(default=None, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _closed: threading.Event = field(
+        default_factory=threading.Event, init=False
+    )
+    _flusher: Optional[threading.Thread] = field(default=None, init=False)
+
+    def __post_init__(self):
+        super().__post_init__()
+        if self.durability not in DURABILITY_POLICIES:
+            raise ValueError(
+                f"Política de durabilidad desconocida: {self.durability}"
+            )
+        self._file = self._open()
+        if self.max_delay > 0:
+            self._flusher = threading.Thread(
+                target=self._flush_periodically,
+                name="transaction-log-flusher",
+                daemon=True,
+            )
+            self._flusher.start()
+        atexit.register(self.close)
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        if self._flusher:
+            self._flusher.join()
+        with self._lock:
+            self._commit()
+            if self._file:
+                self._file.close()
+        super().close()
+        atexit.unregister(self.close)
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _open(self) -> BinaryIO:
+        return open(self.path, "ab")
+
+    def _write(self, records: list[EncodedRecord]):
+        with self._lock:
+            if self._closed.is_set():
+                raise ValueError("El registro de transacciones está cerrado")
+            self._buffer.extend(records)
+            self._buffered_bytes += sum(len(data) for _, data in records)
+            if self._buffered_bytes >= self.max_buffer_bytes:
+                self._commit()
+
+    def _commit(self):
+        """
+        Writes the buffered records. Must be called holding the lock.
+        """
+        if not self._buffer or not self._file:
+            return
+        offset = self._file.tell()
+        self._file.write(b"".join(data for _, data in self._buffer))
+        self._index_records(self._segment(), offset, self._buffer)
+        self._buffer.clear()
+        self._buffered_bytes = 0
+        if self.durability != "none":
+            self._file.flush()
+        if self.durability == "fsync":
+            os.fsync(self._file.fileno())
+            if self.index is not None:
+                self.index.sync()
+
+    def _segment(self) -> int:
+        return 0
+
+    def _read_at(self, entry: IndexEntry) -> bytes:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+        return super()._read_at(entry)
+
+    def _flush_periodically(self):
+        while not self._closed.wait(self.max_delay):
+            try:
+                self.flush()
+            except OSError as e:
+                print(f"No se pudo escribir el registro: {e}")
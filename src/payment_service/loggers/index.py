@@ -0,0 +1,95 @@
+import os
+import struct
+import threading
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterable, Optional
+
+# Key length, then the key, segment, offset and record length.
+_KEY_LENGTH = struct.Struct("<H")
+_LOCATION = struct.Struct("<IQI")
+
+
+@dataclass(frozen=True)
+class IndexEntry:
+    segment: int
+    offset: int
+    length: int
+
+
+@dataclass
+class TransactionIndex:
+    """
+    Maps transaction ids to the location of their record in the log.
+
+    Entries are appended to a binary file and kept in a dict, so lookups
+    are O(1) and only opening the index reads the whole file. Segment 0
+    stands for an unsegmented log. When an id is logged more than once,
+    the last record wins.
+    """
+
+    path: str
+    _entries: dict[str, IndexEntry] = field(default_factory=dict, init=False)
+    _file: Optional[BinaryIO] = field(default=None, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        self._load()
+        self._file = open(self.path, "ab")
+
+    def get(self, transaction_id: str) -> Optional[IndexEntry]:
+        return self._entries.get(transaction_id)
+
+    def add(self, entries: Iterable[tuple[str, IndexEntry]]):
+        data = []
+        with self._lock:
+            for transaction_id, entry in entries:
+                key = transaction_id.encode()
+                data.append(_KEY_LENGTH.pack(len(key)))
+                data.append(key)
+                data.append(
+                    _LOCATION.pack(entry.segment, entry.offset, entry.length)
+                )
+                self._entries[transaction_id] = entry
+            if data and self._file:
+                self._file.write(b"".join(data))
+                self._file.flush()
+
+    def sync(self):
+        with self._lock:
+            if self._file:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _load(self):
+        """
+        Reads the index file, cutting off an entry left half written by a
+        crash.
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb+") as index_file:
+            data = index_file.read()
+            position = 0
+            while position < len(data):
+                key_end = position + _KEY_LENGTH.size
+                if key_end > len(data):
+                    break
+                (key_length,) = _KEY_LENGTH.unpack_from(data, position)
+                location_start = key_end + key_length
+                end = location_start + _LOCATION.size
+                if end > len(data):
+                    break
+                key = data[key_end:location_start].decode()
+                self._entries[key] = IndexEntry(
+                    *_LOCATION.unpack_from(data, location_start)
+                )
+                position = end
+            index_file.truncate(position)
@@ -0,0 +1,23 @@
+import json
+from typing import BinaryIO, Iterator
+
+from .record import LogRecord
+from .record_format import RecordFormat
+
+
+class JsonLinesFormat(RecordFormat):
+    """One JSON object per line."""
+
+    def encode(self, record: LogRecord) -> bytes:
+        line = json.dumps(vars(record), separators=(",", ":"))
+        return line.encode() + b"\n"
+
+    def decode(self, data: bytes) -> Iterator[LogRecord]:
+        for line in data.splitlines():
+            if line:
+                yield LogRecord(**json.loads(line))
+
+    def read(self, log_file: BinaryIO) -> Iterator[LogRecord]:
+        for line in log_file:
+            if line.strip():
+                yield LogRecord(**json.loads(line))
@@ -0,0 +1,21 @@
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class LogRecord:
+    """
+    One event of the transaction log, with a fixed set of fields.
+
+    kind is "payment" or "refund". For refunds, transaction_id is the
+    refund and reference_id the refunded transaction.
+    """
+
+    kind: str
+    timestamp: float
+    status: str
+    amount: int
+    message: Optional[str]
+    transaction_id: Optional[str] = None
+    reference_id: Optional[str] = None
+    customer_name: Optional[str] = None
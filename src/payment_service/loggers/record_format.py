@@ -0,0 +1,23 @@
+from typing import BinaryIO, Iterator, Protocol
+
+from .record import LogRecord
+
+
+class RecordFormat(Protocol):
+    """Protocol for encoding transaction log records.
+
+    Implementations turn a `LogRecord` into the bytes appended to the log
+    and parse those bytes back with `decode`, or record by record from a
+    file with `read`.
+    """
+
+    def encode(self, record: LogRecord) -> bytes: ...
+
+    def decode(self, data: bytes) -> Iterator[LogRecord]: ...
+
+    def read(self, log_file: BinaryIO) -> Iterator[LogRecord]:
+        """
+        Parses the records of a log file. Formats that can split records
+        without parsing them override it to avoid reading the whole file.
+        """
+        yield from self.decode(log_file.read())
@@ -0,0 +1,250 @@
+import gzip
+import json
+import os
+import struct
+import threading
+import time
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, Optional
+
+from .buffered import BufferedTransactionLogger
+from .index import IndexEntry
+from .record import LogRecord
+
+COMPRESSED_BLOCK_BYTES = 64 * 1024
+
+# Uncompressed and compressed offsets of a block of a compressed segment.
+_BLOCK = struct.Struct("<QQ")
+
+
+@dataclass
+class SegmentedTransactionLogger(BufferedTransactionLogger):
+    """
+    Buffered transaction logger that splits the log into segments.
+
+    path names the log; records go to numbered segments next to it, such
+    as transactions.000001.log. A segment is closed once it reaches
+    max_segment_bytes or is older than max_segment_age seconds, and closed
+    segments are gzip-compressed by a background thread. Each block of
+    COMPRESSED_BLOCK_BYTES is compressed on its own and its offsets are
+    kept in a .blocks file, so an indexed lookup in a compressed segment
+    only decompresses one block. The manifest
+    (transactions.manifest.json) lists the closed segments in order, with
+    their size and time span, plus the active one.
+    """
+
+    max_segment_bytes: int = 64 * 1024 * 1024
+    max_segment_age: float = 3600.0
+    compress: bool = True
+    _sequence: int = field(default=0, init=False)
+    _segment_opened_at: float = field(default=0.0, init=False)
+    _segments: list[dict] = field(default_factory=list, init=False)
+    _manifest_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+    _compressor: ThreadPoolExecutor = field(init=False)
+    _blocks: dict[int, tuple[list[int], list[int]]] = field(
+        default_factory=dict, init=False
+    )
+
+    def __post_init__(self):
+        self._compressor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="transaction-log-compressor"
+        )
+        self._segments = self._load_manifest()
+        if self._segments:
+            self._sequence = self._segments[-1]["sequence"]
+        for segment in self._segments:
+            if not segment["compressed"] and self.compress:
+                self._compressor.submit(self._compress, segment)
+        super().__post_init__()
+
+    @property
+    def manifest_path(self) -> str:
+        root, _ = os.path.splitext(self.path)
+        return f"{root}.manifest.json"
+
+    def segment_path(self, sequence: int) -> str:
+        root, extension = os.path.splitext(self.path)
+        return f"{root}.{sequence:06d}{extension}"
+
+    def segments(self) -> list[dict]:
+        """
+        Returns the manifest entries of the closed segments.
+        """
+        with self._manifest_lock:
+            return [dict(segment) for segment in self._segments]
+
+    def rotate(self):
+        """
+        Closes the active segment and starts a new one.
+        """
+        with self._lock:
+            self._commit()
+            self._rotate()
+
+    def read_records(self) -> Iterator[LogRecord]:
+        self.flush()
+        for segment in self.segments():
+            with self._open_segment(segment["sequence"]) as segment_file:
+                yield from self.record_format.read(segment_file)
+        with open(self.segment_path(self._sequence), "rb") as segment_file:
+            yield from self.record_format.read(segment_file)
+
+    def close(self):
+        super().close()
+        self._compressor.shutdown(wait=True)
+
+    def _open(self) -> BinaryIO:
+        # The active segment of a previous run is continued, not rotated.
+        self._sequence += 1
+        self._segment_opened_at = time.time()
+        segment_file = open(self.segment_path(self._sequence), "ab")
+        self._write_manifest()
+        return segment_file
+
+    def _commit(self):
+        super()._commit()
+        if not self._file or not self._file.tell():
+            return
+        if (
+            self._file.tell() >= self.max_segment_bytes
+            or time.time() - self._segment_opened_at >= self.max_segment_age
+        ):
+            self._rotate()
+
+    def _rotate(self):
+        """
+        Must be called holding the lock.
+        """
+        if not self._file or not self._file.tell():
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        segment = {
+            "sequence": self._sequence,
+            "name": os.path.basename(self.segment_path(self._sequence)),
+            "bytes": self._file.tell(),
+            "opened_at": self._segment_opened_at,
+            "closed_at": time.time(),
+            "compressed": False,
+        }
+        self._file.close()
+        with self._manifest_lock:
+            self._segments.append(segment)
+        self._file = self._open()
+        if self.compress:
+            self._compressor.submit(self._compress, segment)
+
+    def _compress(self, segment: dict):
+        path = os.path.join(os.path.dirname(self.path), segment["name"])
+        try:
+            # Concatenated gzip members still read as one gzip stream.
+            blocks = []
+            with open(path, "rb") as source:
+                with open(f"{path}.gz.tmp", "wb") as target:
+                    offset = 0
+                    while block := source.read(COMPRESSED_BLOCK_BYTES):
+                        blocks.append(_BLOCK.pack(offset, target.tell()))
+                        target.write(gzip.compress(block))
+                        offset += len(block)
+            with open(f"{path}.blocks.tmp", "wb") as blocks_file:
+                blocks_file.write(b"".join(blocks))
+            os.replace(f"{path}.blocks.tmp", f"{path}.blocks")
+            os.replace(f"{path}.gz.tmp", f"{path}.gz")
+            with self._manifest_lock:
+                segment["compressed"] = True
+            self._write_manifest()
+            os.remove(path)
+        except OSError as e:
+            print(f"No se pudo comprimir el segmento {path}: {e}")
+
+    def _segment(self) -> int:
+        return self._sequence
+
+    def _read_at(self, entry: IndexEntry) -> bytes:
+        with self._lock:
+            if self._file:
+                self._file.flush()
+        path = self.segment_path(entry.segment)
+        try:
+            segment_file = open(path, "rb")
+        except FileNotFoundError:
+            return self._read_compressed_at(entry)
+        with segment_file:
+            segment_file.seek(entry.offset)
+            return segment_file.read(entry.length)
+
+    def _read_compressed_at(self, entry: IndexEntry) -> bytes:
+        """
+        Reads a record of a compressed segment, starting at the block that
+        holds it. Segments compressed without a .blocks file are scanned
+        up to the offset.
+        """
+        path = self.segment_path(entry.segment)
+        start, compressed_start = 0, 0
+        blocks = self._load_blocks(entry.segment)
+        if blocks:
+            starts, compressed_starts = blocks
+            block = bisect_right(starts, entry.offset) - 1
+            start, compressed_start = starts[block], compressed_starts[block]
+        with open(f"{path}.gz", "rb") as compressed:
+            compressed.seek(compressed_start)
+            with gzip.GzipFile(fileobj=compressed) as segment_file:
+                segment_file.seek(entry.offset - start)
+                return segment_file.read(entry.length)
+
+    def _load_blocks(
+        self, sequence: int
+    ) -> Optional[tuple[list[int], list[int]]]:
+        blocks = self._blocks.get(sequence)
+        if blocks is not None:
+            return blocks
+        try:
+            path = f"{self.segment_path(sequence)}.blocks"
+            with open(path, "rb") as blocks_file:
+                offsets = list(_BLOCK.iter_unpack(blocks_file.read()))
+        except FileNotFoundError:
+            return None
+        if not offsets:
+            return None
+        blocks = self._blocks[sequence] = (
+            [start for start, _ in offsets],
+            [compressed_start for _, compressed_start in offsets],
+        )
+        return blocks
+
+    def _open_segment(self, sequence: int) -> BinaryIO:
+        """
+        Opens a segment for reading; a compressed segment is decompressed
+        on the fly.
+        """
+        path = self.segment_path(sequence)
+        try:
+            return open(path, "rb")
+        except FileNotFoundError:
+            # Already replaced by its compressed copy.
+            return gzip.open(f"{path}.gz", "rb")  # type: ignore
+
+    def _load_manifest(self) -> list[dict]:
+        if not os.path.exists(self.manifest_path):
+            return []
+        with open(self.manifest_path) as manifest_file:
+            return json.load(manifest_file)["segments"]
+
+    def _write_manifest(self):
+        """
+        Replaces the manifest atomically, so readers never see it half
+        written.
+        """
+        with self._manifest_lock:
+            manifest = {
+                "segments": self._segments,
+                "active": os.path.basename(self.segment_path(self._sequence)),
+            }
+            temporary = f"{self.manifest_path}.tmp"
+            with open(temporary, "w") as manifest_file:
+                json.dump(manifest, manifest_file, indent=2)
+            os.replace(temporary, self.manifest_path)
@@ -0,0 +1,27 @@
+from typing import Iterator
+
+from .record import LogRecord
+from .record_format import RecordFormat
+
+
+class TextFormat(RecordFormat):
+    """The original human-readable multi-line format."""
+
+    def encode(self, record: LogRecord) -> bytes:
+        if record.kind == "refund":
+            lines = [
+                f"Refund processed for transaction {record.reference_id}\n",
+                f"Refund status: {record.status}\n",
+            ]
+        else:
+            lines = [
+                f"{record.customer_name} paid {record.amount}\n",
+                f"Payment status: {record.status}\n",
+            ]
+            if record.transaction_id:
+                lines.append(f"Transaction ID: {record.transaction_id}\n")
+        lines.append(f"Message: {record.message}\n")
+        return "".join(lines).encode()
+
+    def decode(self, data: bytes) -> Iterator[LogRecord]:
+        raise ValueError("El formato de texto no se puede leer")
@@ -1,30 +1,180 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Iterable, Iterator, Optional
+
 from commons import CustomerData, PaymentData, PaymentResponse
 
+from .index import IndexEntry, TransactionIndex
+from .record import LogRecord
+from .record_format import RecordFormat
+from .text_format import TextFormat
+
+# A record ready to be written: its index key and its encoded bytes.
+EncodedRecord = tuple[Optional[str], bytes]
 
+
+@dataclass
 class TransactionLogger:
+    """
+    Appends one record per payment or refund to the transaction log.
+
+    record_format decides how records are written: the default text
+    format is meant for people, JsonLinesFormat and BinaryFormat can be
+    parsed back with read_records(). With an index, every record with a
+    transaction id can be found with find_transaction() without scanning
+    the log; the text format cannot be read back, so it cannot be indexed.
+    """
+
+    path: str = "transactions.log"
+    record_format: RecordFormat = field(default_factory=TextFormat)
+    index: Optional[TransactionIndex] = None
+    _write_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+
+    def __post_init__(self):
+        if self.index is not None and isinstance(
+            self.record_format, TextFormat
+        ):
+            raise ValueError("El formato de texto no se puede indexar")
+
     def log_transaction(
         self,
         customer_data: CustomerData,
         payment_data: PaymentData,
         payment_response: PaymentResponse,
     ):
-        with open("transactions.log", "a") as log_file:
-            log_file.write(
-                f"{customer_data.name} paid {payment_data.amount}\n"
-            )
-            log_file.write(f"Payment status: {payment_response.status}\n")
-            if payment_response.transaction_id:
-                log_file.write(
-                    f"Transaction ID: {payment_response.transaction_id}\n"
+        self._log(
+            [
+                self._payment_record(
+                    customer_data, payment_data, payment_response
                 )
-            log_file.write(f"Message: {payment_response.message}\n")
+            ]
+        )
+
+    def log_transactions(
+        self,
+        entries: Iterable[tuple[CustomerData, PaymentData, PaymentResponse]],
+    ):
+        """
+        Logs several transactions with a single open and write.
+        """
+        self._log(
+            [
+                self._payment_record(customer_data, payment_data, response)
+                for customer_data, payment_data, response in entries
+            ]
+        )
 
     def log_refund(
         self, transaction_id: str, refund_response: PaymentResponse
     ):
-        with open("transactions.log", "a") as log_file:
-            log_file.write(
-                f"Refund processed for transaction {transaction_id}\n"
-            )
-            log_file.write(f"Refund status: {refund_response.status}\n")
-            log_file.write(f"Message: {refund_response.message}\n")
+        self._log([self._refund_record(transaction_id, refund_response)])
+
+    def log_refunds(self, entries: Iterable[tuple[str, PaymentResponse]]):
+        """
+        Logs several refunds with a single open and write.
+        """
+        self._log(
+            [
+                self._refund_record(transaction_id, response)
+                for transaction_id, response in entries
+            ]
+        )
+
+    def read_records(self) -> Iterator[LogRecord]:
+        """
+        Parses the records of the log back, for structured formats.
+        """
+        self.flush()
+        with open(self.path, "rb") as log_file:
+            yield from self.record_format.read(log_file)
+
+    def find_transaction(self, transaction_id: str) -> Optional[LogRecord]:
+        """
+        Returns the last record logged for a payment or refund id, looked
+        up in the index.
+        """
+        if self.index is None:
+            raise ValueError("El registro de transacciones no tiene índice")
+        self.flush()
+        entry = self.index.get(transaction_id)
+        if entry is None:
+            return None
+        data = self._read_at(entry)
+        return next(self.record_format.decode(data), None)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        if self.index is not None:
+            self.index.close()
+
+    def _log(self, records: list[LogRecord]):
+        if not records:
+            return
+        self._write(
+            [
+                (record.transaction_id, self.record_format.encode(record))
+                for record in records
+            ]
+        )
+
+    def _write(self, records: list[EncodedRecord]):
+        with self._write_lock, open(self.path, "ab") as log_file:
+            offset = log_file.tell()
+            log_file.write(b"".join(data for _, data in records))
+            self._index_records(0, offset, records)
+
+    def _index_records(
+        self, segment: int, offset: int, records: list[EncodedRecord]
+    ):
+        """
+        Adds records written at offset of a segment to the index.
+        """
+        if self.index is None:
+            return
+        entries = []
+        for transaction_id, data in records:
+            if transaction_id:
+                entries.append(
+                    (transaction_id, IndexEntry(segment, offset, len(data)))
+                )
+            offset += len(data)
+        self.index.add(entries)
+
+    def _read_at(self, entry: IndexEntry) -> bytes:
+        with open(self.path, "rb") as log_file:
+            log_file.seek(entry.offset)
+            return log_file.read(entry.length)
+
+    def _payment_record(
+        self,
+        customer_data: CustomerData,
+        payment_data: PaymentData,
+        payment_response: PaymentResponse,
+    ) -> LogRecord:
+        return LogRecord(
+            kind="payment",
+            timestamp=time.time(),
+            status=payment_response.status,
+            amount=payment_data.amount,
+            message=payment_response.message,
+            transaction_id=payment_response.transaction_id,
+            customer_name=customer_data.name,
+        )
+
+    def _refund_record(
+        self, transaction_id: str, refund_response: PaymentResponse
+    ) -> LogRecord:
+        return LogRecord(
+            kind="refund",
+            timestamp=time.time(),
+            status=refund_response.status,
+            amount=refund_response.amount,
+            message=refund_response.message,
+            transaction_id=refund_response.transaction_id,
+            reference_id=transaction_id,
+        )
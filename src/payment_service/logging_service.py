@@ -1,9 +1,18 @@
+import os
+from concurrent.futures import Future
 from dataclasses import dataclass
+from typing import Iterable, Optional
+
 from decorator_protocol import PaymentServiceDecoratorProtocol
 from service_protocol import PaymentServiceProtocol
 
 
-from commons import CustomerData, PaymentData, PaymentResponse
+from commons import (
+    BatchResponse,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+)
 
 
 @dataclass
@@ -21,6 +30,23 @@ class PaymentServiceLogging(PaymentServiceDecoratorProtocol):
         print("Finish process transaction")
         return response
 
+    def submit_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]:
+        print("Submit process transaction")
+
+        return self.wrapped.submit_transaction(customer_data, payment_data)
+
+    def process_batch(
+        self, payments: Iterable[tuple[CustomerData, PaymentData]]
+    ) -> BatchResponse:
+        print("Start process batch")
+
+        response = self.wrapped.process_batch(payments)
+
+        print(f"Finish process batch of {response.total} payments")
+        return response
+
     def process_refund(self, transaction_id: str):
         print(f"Start process refund using: {transaction_id}")
 
@@ -29,6 +55,22 @@ class PaymentServiceLogging(PaymentServiceDecoratorProtocol):
         print("Finish process refund")
         return response
 
+    def process_refunds(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str | os.PathLike] = None,
+    ) -> BatchResponse:
+        print("Start process refunds")
+
+        response = self.wrapped.process_refunds(
+            transaction_ids, max_workers, chunk_size, checkpoint_path
+        )
+
+        print(f"Finish process refunds of {response.total} transactions")
+        return response
+
     def setup_recurring(
         self, customer_data: CustomerData, payment_data: PaymentData
     ):
@@ -0,0 +1,28 @@
+from .metrics import MetricsProtocol
+
+from .in_memory import Histogram, InMemoryMetrics
+from .null import NullMetrics
+
+_default_metrics: MetricsProtocol = NullMetrics()
+
+
+def get_default_metrics() -> MetricsProtocol:
+    return _default_metrics
+
+
+def set_default_metrics(metrics: MetricsProtocol):
+    """
+    Sets the metrics used by components created without explicit ones.
+    """
+    global _default_metrics
+    _default_metrics = metrics
+
+
+__all__ = [
+    "MetricsProtocol",
+    "NullMetrics",
+    "InMemoryMetrics",
+    "Histogram",
+    "get_default_metrics",
+    "set_default_metrics",
+]
@@ -0,0 +1,108 @@
+import threading
+from bisect import bisect_left
+from dataclasses import dataclass, field
+
+from .metrics import MetricsProtocol
+
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+@dataclass
+class Histogram:
+    """
+    Fixed-bucket latency histogram.
+
+    counts[i] holds the observations up to bounds[i]; the last count holds
+    those above the largest bound.
+    """
+
+    bounds: tuple[float, ...] = DEFAULT_BUCKETS
+    counts: list[int] = field(init=False)
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+
+    def __post_init__(self):
+        self.counts = [0] * (len(self.bounds) + 1)
+
+    def observe(self, seconds: float):
+        self.counts[bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, p: float) -> float:
+        """
+        Estimates the p-th percentile as the upper bound of its bucket.
+        """
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "p99": self.percentile(99),
+            "max": self.max,
+        }
+
+
+@dataclass
+class InMemoryMetrics(MetricsProtocol):
+    """
+    Keeps histograms and counters in memory, for tests, load runs and
+    exporters that poll snapshot().
+    """
+
+    buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    histograms: dict[str, Histogram] = field(default_factory=dict)
+    counters: dict[str, int] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def observe(self, name: str, seconds: float):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "histograms": {
+                    name: histogram.summary()
+                    for name, histogram in self.histograms.items()
+                },
+                "counters": dict(self.counters),
+            }
+
+    def reset(self):
+        with self._lock:
+            self.histograms.clear()
+            self.counters.clear()
@@ -0,0 +1,14 @@
+from typing import Protocol
+
+
+class MetricsProtocol(Protocol):
+    """Protocol for recording service metrics.
+
+    Implementations receive latencies in seconds through `observe` and
+    event counts through `increment`. Both are called on hot paths, so
+    they should be cheap and must never raise.
+    """
+
+    def observe(self, name: str, seconds: float): ...
+
+    def increment(self, name: str, value: int = 1): ...
@@ -1,7 +1,14 @@
-from .notifier import NotifierProtocol
+from .notifier import AsyncNotifierProtocol, NotifierProtocol
 
+from .async_adapter import AsyncNotifierAdapter
 from .email import EmailNotifier
 from .sms import SMSNotifier
 
 
-__all__ = ["NotifierProtocol", "EmailNotifier", "SMSNotifier"]
+__all__ = [
+    "NotifierProtocol",
+    "EmailNotifier",
+    "SMSNotifier",
+    "AsyncNotifierProtocol",
+    "AsyncNotifierAdapter",
+]
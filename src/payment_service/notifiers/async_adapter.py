@@ -0,0 +1,16 @@
+import asyncio
+from dataclasses import dataclass
+
+from commons import CustomerData
+
+from .notifier import AsyncNotifierProtocol, NotifierProtocol
+
+
+@dataclass
+class AsyncNotifierAdapter(AsyncNotifierProtocol):
+    """Runs a blocking notifier in the default executor."""
+
+    wrapped: NotifierProtocol
+
+    async def send_confirmation(self, customer_data: CustomerData):
+        await asyncio.to_thread(self.wrapped.send_confirmation, customer_data)
@@ -12,3 +12,9 @@ class NotifierProtocol(Protocol):
     """
 
     def send_confirmation(self, customer_data: CustomerData): ...
+
+
+class AsyncNotifierProtocol(Protocol):
+    """Protocol for sending notifications asynchronously."""
+
+    async def send_confirmation(self, customer_data: CustomerData): ...
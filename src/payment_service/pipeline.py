@@ -0,0 +1,196 @@
+import threading
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from queue import Queue
+from typing import Callable, Optional, Self
+
+from commons import CustomerData, PaymentData, PaymentResponse, Request
+from service_protocol import PaymentServiceProtocol
+
+DEFAULT_STAGE_WORKERS = {
+    "validate": 2,
+    "charge": 16,
+    "listeners": 1,
+    "notify": 4,
+    "log": 1,
+}
+
+_STOP = object()
+
+
+@dataclass
+class PipelineItem:
+    customer_data: CustomerData
+    payment_data: PaymentData
+    future: Future
+    payment_response: Optional[PaymentResponse] = None
+
+
+@dataclass
+class Stage:
+    name: str
+    handler: Callable[[PipelineItem], bool]
+    workers: int = 1
+    queue_size: int = 1000
+    forward_on_error: bool = False
+    next_stage: Optional["Stage"] = None
+    queue: Queue = field(init=False)
+    _threads: list[threading.Thread] = field(default_factory=list, init=False)
+
+    def __post_init__(self):
+        self.queue = Queue(maxsize=self.queue_size)
+
+    def start(self):
+        for index in range(self.workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"pipeline-{self.name}-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads.clear()
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+            try:
+                forward = self.handler(item)
+            except Exception as e:
+                print(f"fallo en la etapa {self.name}: {e}")
+                forward = self.forward_on_error
+            if forward and self.next_stage:
+                self.next_stage.queue.put(item)
+
+
+@dataclass
+class PaymentPipeline:
+    """
+    Runs the steps of PaymentService.process_transaction as stages
+    connected by bounded queues.
+
+    The future returned by submit is resolved as soon as the charge stage
+    finishes; listeners, notifier and logger run in later stages so they do
+    not add to the charge latency.
+    """
+
+    service: PaymentServiceProtocol
+    workers: dict[str, int] = field(default_factory=dict)
+    queue_size: int = 1000
+    stages: list[Stage] = field(default_factory=list, init=False)
+    _closed: bool = field(default=False, init=False)
+    _submit_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+
+    def __post_init__(self):
+        handlers = [
+            ("validate", self._validate),
+            ("charge", self._charge),
+            ("listeners", self._notify_listeners),
+            ("notify", self._send_confirmation),
+            ("log", self._log),
+        ]
+        for name, handler in handlers:
+            stage = Stage(
+                name=name,
+                handler=handler,
+                workers=self.workers.get(name, DEFAULT_STAGE_WORKERS[name]),
+                queue_size=self.queue_size,
+                forward_on_error=name not in ("validate", "charge"),
+            )
+            if self.stages:
+                self.stages[-1].next_stage = stage
+            self.stages.append(stage)
+
+    def start(self) -> Self:
+        for stage in self.stages:
+            stage.start()
+        return self
+
+    def submit(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]:
+        """
+        Queues a payment. Blocks while the validation queue is full and
+        raises RuntimeError once the pipeline is closed.
+        """
+        future: Future[PaymentResponse] = Future()
+        with self._submit_lock:
+            if self._closed:
+                raise RuntimeError("El pipeline está cerrado")
+            self.stages[0].queue.put(
+                PipelineItem(customer_data, payment_data, future)
+            )
+        return future
+
+    def queue_depths(self) -> dict[str, int]:
+        return {stage.name: stage.queue.qsize() for stage in self.stages}
+
+    def close(self):
+        """
+        Drains every stage in order and stops its workers.
+        """
+        with self._submit_lock:
+            self._closed = True
+        for stage in self.stages:
+            stage.stop()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _validate(self, item: PipelineItem) -> bool:
+        try:
+            request = Request(
+                customer_data=item.customer_data,
+                payment_data=item.payment_data,
+            )
+            self.service.validators.handle(request=request)
+        except Exception as e:
+            print(f"fallo en las validaciones: {e}")
+            item.future.set_exception(e)
+            return False
+        return True
+
+    def _charge(self, item: PipelineItem) -> bool:
+        try:
+            item.payment_response = (
+                self.service.payment_processor.process_transaction(
+                    item.customer_data, item.payment_data
+                )
+            )
+        except Exception as e:
+            item.future.set_exception(e)
+            return False
+        item.future.set_result(item.payment_response)
+        return True
+
+    def _notify_listeners(self, item: PipelineItem) -> bool:
+        transaction_id = item.payment_response.transaction_id  # type: ignore
+        self.service.listeners.notifyAll(
+            f"pago exitoso al evento: {transaction_id}"
+        )
+        return True
+
+    def _send_confirmation(self, item: PipelineItem) -> bool:
+        self.service.notifier.send_confirmation(item.customer_data)
+        return True
+
+    def _log(self, item: PipelineItem) -> bool:
+        self.service.logger.log_transaction(
+            item.customer_data,
+            item.payment_data,
+            item.payment_response,  # type: ignore
+        )
+        return True
@@ -1,8 +1,25 @@
+from .async_adapter import AsyncPaymentProcessorAdapter
+from .async_stripe_processor import AsyncStripePaymentProcessor
+from .circuit_breaker import CircuitBreaker, CircuitBreakerProcessor
+from .customer_cache import CacheStats, CustomerCache
+from .failover_queue import FailoverQueue
 from .local_processor import LocalPaymentProcessor
 from .offline_processor import OfflinePaymentProcessor
-from .payment import PaymentProcessorProtocol
-from .recurring import RecurringPaymentProcessorProtocol
-from .refunds import RefundProcessorProtocol
+from .payment import AsyncPaymentProcessorProtocol, PaymentProcessorProtocol
+from .recurring import (
+    AsyncRecurringPaymentProcessorProtocol,
+    RecurringPaymentProcessorProtocol,
+)
+from .price_cache import PriceCache
+from .refunds import AsyncRefundProcessorProtocol, RefundProcessorProtocol
+from .rate_limiter import RateLimiter, RateLimitExceeded
+from .retry import RetryBudget, RetryPolicy
+from .stripe_client import (
+    async_http_available,
+    create_async_stripe_client,
+    create_stripe_client,
+    get_default_stripe_client,
+)
 from .stripe_processor import StripePaymentProcessor
 
 __all__ = [
@@ -12,4 +29,23 @@ __all__ = [
     "RecurringPaymentProcessorProtocol",
     "RefundProcessorProtocol",
     "LocalPaymentProcessor",
+    "AsyncPaymentProcessorProtocol",
+    "AsyncRecurringPaymentProcessorProtocol",
+    "AsyncRefundProcessorProtocol",
+    "AsyncStripePaymentProcessor",
+    "AsyncPaymentProcessorAdapter",
+    "CircuitBreaker",
+    "CircuitBreakerProcessor",
+    "FailoverQueue",
+    "CustomerCache",
+    "CacheStats",
+    "PriceCache",
+    "RateLimiter",
+    "RateLimitExceeded",
+    "RetryPolicy",
+    "RetryBudget",
+    "create_stripe_client",
+    "create_async_stripe_client",
+    "async_http_available",
+    "get_default_stripe_client",
 ]
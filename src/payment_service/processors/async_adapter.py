@@ -0,0 +1,45 @@
+import asyncio
+from dataclasses import dataclass
+
+from commons import CustomerData, PaymentData, PaymentResponse
+
+from .payment import AsyncPaymentProcessorProtocol, PaymentProcessorProtocol
+from .recurring import AsyncRecurringPaymentProcessorProtocol
+from .refunds import AsyncRefundProcessorProtocol
+
+
+@dataclass
+class AsyncPaymentProcessorAdapter(
+    AsyncPaymentProcessorProtocol,
+    AsyncRefundProcessorProtocol,
+    AsyncRecurringPaymentProcessorProtocol,
+):
+    """
+    Exposes a blocking processor through the async protocols.
+
+    Calls run in the default executor so they do not block the event loop.
+    """
+
+    wrapped: PaymentProcessorProtocol
+
+    async def process_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        return await asyncio.to_thread(
+            self.wrapped.process_transaction, customer_data, payment_data
+        )
+
+    async def refund_payment(self, transaction_id: str) -> PaymentResponse:
+        return await asyncio.to_thread(
+            self.wrapped.refund_payment,  # type: ignore
+            transaction_id,
+        )
+
+    async def setup_recurring_payment(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        return await asyncio.to_thread(
+            self.wrapped.setup_recurring_payment,  # type: ignore
+            customer_data,
+            payment_data,
+        )
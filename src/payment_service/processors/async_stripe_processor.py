@@ -0,0 +1,185 @@
+import asyncio
+import os
+from dataclasses import dataclass, field
+from typing import Optional
+
+import stripe
+from dotenv import load_dotenv
+from stripe.error import StripeError  # type: ignore
+
+from commons import CustomerData, PaymentData, PaymentResponse
+
+from .payment import AsyncPaymentProcessorProtocol
+from .price_cache import PriceCache, get_shared_price_cache
+from .recurring import AsyncRecurringPaymentProcessorProtocol
+from .refunds import AsyncRefundProcessorProtocol
+from .stripe_client import get_default_stripe_client, object_id
+
+_ = load_dotenv()
+
+
+@dataclass
+class AsyncStripePaymentProcessor(
+    AsyncPaymentProcessorProtocol,
+    AsyncRefundProcessorProtocol,
+    AsyncRecurringPaymentProcessorProtocol,
+):
+    """
+    Stripe processor built on the async variants of the Stripe API.
+
+    Every round-trip is awaited, so one event loop can keep many charges
+    in flight at the same time. When no client is given, the pooled async
+    client of the running event loop is used, so the processor can be
+    reused across loops; a client passed in must stay on a single loop. As
+    in the sync processor, subscriptions are only expanded on request and
+    the amount comes from the cached price.
+    """
+
+    client: Optional[stripe.StripeClient] = None
+    price_cache: PriceCache = field(default_factory=get_shared_price_cache)
+    subscription_expand: list[str] = field(default_factory=list)
+
+    @property
+    def stripe_client(self) -> stripe.StripeClient:
+        return self.client or get_default_stripe_client(asynchronous=True)
+
+    async def process_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        try:
+            charge = await self.stripe_client.charges.create_async(
+                params={
+                    "amount": payment_data.amount,
+                    "currency": "usd",
+                    "source": payment_data.source,
+                    "description": "Charge for " + customer_data.name,
+                }
+            )
+            print("Payment successful")
+            return PaymentResponse(
+                status=charge["status"],
+                amount=charge["amount"],
+                transaction_id=charge["id"],
+                message="Payment successful",
+            )
+        except StripeError as e:
+            print("Payment failed:", e)
+            return PaymentResponse(
+                status="failed",
+                amount=payment_data.amount,
+                transaction_id=None,
+                message=str(e),
+                error_type=type(e).__name__,
+            )
+
+    async def refund_payment(self, transaction_id: str) -> PaymentResponse:
+        try:
+            refund = await self.stripe_client.refunds.create_async(
+                params={"charge": transaction_id}
+            )
+            print("Refund successful")
+            return PaymentResponse(
+                status=refund["status"],
+                amount=refund["amount"],
+                transaction_id=refund["id"],
+                message="Refund successful",
+            )
+        except StripeError as e:
+            print("Refund failed:", e)
+            return PaymentResponse(
+                status="failed",
+                amount=0,
+                transaction_id=None,
+                message=str(e),
+                error_type=type(e).__name__,
+            )
+
+    async def setup_recurring_payment(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        price_id = os.getenv("STRIPE_PRICE_ID", "")
+        try:
+            client = self.stripe_client
+            customer, payment_method, amount = await asyncio.gather(
+                self._get_or_create_customer(customer_data),
+                client.payment_methods.retrieve_async(payment_data.source),
+                self._get_price_amount(price_id),
+            )
+
+            if object_id(payment_method.get("customer")) != customer.id:
+                await client.payment_methods.attach_async(
+                    payment_method.id,
+                    params={"customer": customer.id},
+                )
+            invoice_settings = customer.get("invoice_settings") or {}
+            default = invoice_settings.get("default_payment_method")
+            if object_id(default) != payment_method.id:
+                await client.customers.update_async(
+                    customer.id,
+                    params={
+                        "invoice_settings": {
+                            "default_payment_method": payment_method.id,
+                        },
+                    },
+                )
+
+            params: dict = {
+                "customer": customer.id,
+                "items": [
+                    {"price": price_id},
+                ],
+            }
+            if self.subscription_expand:
+                params["expand"] = self.subscription_expand
+            response = await client.raw_request_async(
+                "post", "/v1/subscriptions", **params
+            )
+            subscription = response.data
+
+            print("Recurring payment setup successful")
+            return PaymentResponse(
+                status=subscription["status"],
+                amount=amount,
+                transaction_id=subscription["id"],
+                message="Recurring payment setup successful",
+            )
+        except StripeError as e:
+            print("Recurring payment setup failed:", e)
+            return PaymentResponse(
+                status="failed",
+                amount=0,
+                transaction_id=None,
+                message=str(e),
+                error_type=type(e).__name__,
+            )
+
+    async def _get_price_amount(self, price_id: str) -> int:
+        amount = self.price_cache.get(price_id)
+        if amount is None:
+            price = await self.stripe_client.prices.retrieve_async(price_id)
+            amount = price["unit_amount"]
+            self.price_cache.put(price_id, amount)
+        return amount
+
+    async def _get_or_create_customer(
+        self, customer_data: CustomerData
+    ) -> stripe.Customer:
+        """
+        Creates a new customer in Stripe or retrieves an existing one.
+        """
+        if customer_data.customer_id:
+            customer = await self.stripe_client.customers.retrieve_async(
+                customer_data.customer_id
+            )
+            print(f"Customer retrieved: {customer.id}")
+        else:
+            if not customer_data.contact_info.email:
+                raise ValueError("Email required for subscriptions")
+            customer = await self.stripe_client.customers.create_async(
+                params={
+                    "name": customer_data.name,
+                    "email": customer_data.contact_info.email,
+                }
+            )
+            print(f"Customer created: {customer.id}")
+        return customer
@@ -0,0 +1,229 @@
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Optional
+
+from stripe.error import StripeError  # type: ignore
+
+from commons import CustomerData, PaymentData, PaymentResponse
+
+from .failover_queue import FailoverQueue
+from .payment import PaymentProcessorProtocol
+from .recurring import RecurringPaymentProcessorProtocol
+from .refunds import RefundProcessorProtocol
+
+PROVIDER_ERROR_TYPES = frozenset(
+    {"APIConnectionError", "APIError", "RateLimitError"}
+)
+
+
+@dataclass
+class CircuitBreaker:
+    """
+    Tracks the outcome of the last calls to a provider.
+
+    The breaker opens when, over at least min_calls of the last window
+    calls, the share of failed or slow calls reaches failure_rate_threshold.
+    After open_duration it lets half_open_max_calls trial calls through and
+    closes again if they all succeed.
+    """
+
+    name: str
+    window: int = 50
+    min_calls: int = 10
+    failure_rate_threshold: float = 0.5
+    slow_call_threshold: float = 5.0
+    open_duration: float = 30.0
+    half_open_max_calls: int = 3
+    state: str = field(default="closed", init=False)
+    _outcomes: deque[bool] = field(init=False)
+    _opened_at: float = field(default=0.0, init=False)
+    _trial_calls: int = field(default=0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        self._outcomes = deque(maxlen=self.window)
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == "open":
+                if time.monotonic() - self._opened_at < self.open_duration:
+                    return False
+                self.state = "half_open"
+                self._trial_calls = 0
+            if self.state == "half_open":
+                if self._trial_calls >= self.half_open_max_calls:
+                    return False
+                self._trial_calls += 1
+            return True
+
+    def record(self, success: bool, duration: float):
+        failed = not success or duration >= self.slow_call_threshold
+        with self._lock:
+            if self.state == "half_open":
+                if failed:
+                    self._open()
+                elif self._trial_calls >= self.half_open_max_calls:
+                    self.state = "closed"
+                    self._outcomes.clear()
+                    print(f"Circuito {self.name} cerrado")
+                return
+            self._outcomes.append(failed)
+            if len(self._outcomes) < self.min_calls:
+                return
+            failure_rate = sum(self._outcomes) / len(self._outcomes)
+            if failure_rate >= self.failure_rate_threshold:
+                self._open()
+
+    def release(self):
+        """
+        Gives back a call let through by allow_request without recording
+        an outcome, for calls that failed before reaching the provider.
+        """
+        with self._lock:
+            if self.state == "half_open" and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        print(f"Circuito {self.name} abierto")
+
+
+@dataclass
+class CircuitBreakerProcessor(
+    PaymentProcessorProtocol,
+    RefundProcessorProtocol,
+    RecurringPaymentProcessorProtocol,
+):
+    """
+    Guards a processor with a circuit breaker.
+
+    While the breaker is open, payments are handed to the fallback
+    processor and answered with status "queued"; they are kept in queued
+    so replay_queued() can charge them once the provider recovers. At
+    most max_queued payments are kept, later ones are rejected. With
+    queue_path the queue is kept in a locked JSONL file instead of memory,
+    so it survives a restart and can be shared by several processes. Calls
+    that already reached the provider are never failed over, since a timed
+    out charge may have gone through. Refunds and recurring setups are not
+    eligible for failover and fail fast.
+    """
+
+    wrapped: PaymentProcessorProtocol
+    breaker: CircuitBreaker
+    fallback: Optional[PaymentProcessorProtocol] = None
+    max_queued: int = 10_000
+    queue_path: Optional[str | os.PathLike] = None
+    queued: FailoverQueue = field(init=False)
+
+    def __post_init__(self):
+        self.queued = FailoverQueue(
+            max_size=self.max_queued, path=self.queue_path
+        )
+
+    def process_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        if not self.breaker.allow_request():
+            return self._fail_over(customer_data, payment_data)
+        return self._guarded(
+            self.wrapped.process_transaction, customer_data, payment_data
+        )
+
+    def refund_payment(self, transaction_id: str) -> PaymentResponse:
+        if not self.breaker.allow_request():
+            return self._rejected(0)
+        return self._guarded(
+            self.wrapped.refund_payment,  # type: ignore
+            transaction_id,
+        )
+
+    def setup_recurring_payment(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        if not self.breaker.allow_request():
+            return self._rejected(0)
+        return self._guarded(
+            self.wrapped.setup_recurring_payment,  # type: ignore
+            customer_data,
+            payment_data,
+        )
+
+    def drain_queued(self) -> list[tuple[CustomerData, PaymentData]]:
+        """
+        Returns and forgets the payments queued during failover.
+        """
+        return self.queued.drain()
+
+    def replay_queued(
+        self,
+    ) -> list[tuple[CustomerData, PaymentData, PaymentResponse]]:
+        """
+        Charges the queued payments through the wrapped processor.
+
+        Does nothing while the breaker is open; payments that fail over
+        again during the replay are queued again. Each payment leaves the
+        queue only once it has been charged or queued again, and only one
+        replay runs at a time per queue.
+        """
+        if self.breaker.state == "open":
+            return []
+        return self.queued.replay(self.process_transaction)
+
+    def _guarded(self, call, *args) -> PaymentResponse:
+        started = time.monotonic()
+        try:
+            response = call(*args)
+        except StripeError as e:
+            self.breaker.record(
+                type(e).__name__ not in PROVIDER_ERROR_TYPES,
+                time.monotonic() - started,
+            )
+            raise
+        except Exception:
+            # Invalid input and other local errors say nothing about the
+            # provider's health.
+            self.breaker.release()
+            raise
+        self.breaker.record(
+            not self._is_provider_failure(response),
+            time.monotonic() - started,
+        )
+        return response
+
+    def _fail_over(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
+        if not self.fallback:
+            return self._rejected(payment_data.amount)
+        if not self.queued.put(customer_data, payment_data):
+            return self._rejected(payment_data.amount)
+        response = self.fallback.process_transaction(
+            customer_data, payment_data
+        )
+        return response.model_copy(
+            update={
+                "status": "queued",
+                "message": f"{self.breaker.name} unavailable, payment queued",
+            }
+        )
+
+    def _rejected(self, amount: int) -> PaymentResponse:
+        return PaymentResponse(
+            status="failed",
+            amount=amount,
+            transaction_id=None,
+            message=f"{self.breaker.name} unavailable, circuit open",
+            error_type="CircuitOpen",
+        )
+
+    @staticmethod
+    def _is_provider_failure(response: PaymentResponse) -> bool:
+        return (
+            response.status == "failed"
+            and response.error_type in PROVIDER_ERROR_TYPES
+        )
@@ -0,0 +1,157 @@
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+import stripe
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    stale_hits: int = 0
+    misses: int = 0
+    refreshes: int = 0
+    refresh_errors: int = 0
+    evictions: int = 0
+
+
+@dataclass
+class _CacheEntry:
+    customer: stripe.Customer
+    stored_at: float
+
+
+@dataclass
+class CustomerCache:
+    """
+    LRU cache of Stripe customers with a time to live, keyed both by
+    customer id and by email.
+
+    Entries older than ttl but younger than ttl + stale_ttl are still
+    returned, while a background thread refreshes them from Stripe
+    (stale-while-revalidate).
+    """
+
+    max_entries: int = 10_000
+    ttl: float = 300.0
+    stale_ttl: float = 3600.0
+    stats: CacheStats = field(default_factory=CacheStats)
+    _entries: OrderedDict[str, _CacheEntry] = field(
+        default_factory=OrderedDict, init=False
+    )
+    _refreshing: set[str] = field(default_factory=set, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    @staticmethod
+    def id_key(customer_id: str) -> str:
+        return f"id:{customer_id}"
+
+    @staticmethod
+    def email_key(email: str) -> str:
+        return f"email:{email.lower()}"
+
+    def get_or_load(
+        self,
+        key: str,
+        load: Callable[[], stripe.Customer],
+        refresh: Callable[[str], stripe.Customer],
+    ) -> stripe.Customer:
+        """
+        Returns the cached customer for key, calling load on a miss.
+
+        refresh receives the customer id and is used to revalidate stale
+        entries in the background.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                age = now - entry.stored_at
+                if age <= self.ttl:
+                    self.stats.hits += 1
+                    self._entries.move_to_end(key)
+                    return entry.customer
+                if age <= self.ttl + self.stale_ttl:
+                    self.stats.stale_hits += 1
+                    self._entries.move_to_end(key)
+                    self._schedule_refresh(key, entry.customer.id, refresh)
+                    return entry.customer
+                del self._entries[key]
+            self.stats.misses += 1
+
+        customer = load()
+        self.put(customer, key)
+        return customer
+
+    def put(self, customer: stripe.Customer, *extra_keys: str):
+        """
+        Stores a customer under its id, its email and any extra keys.
+        """
+        keys = {self.id_key(customer.id), *extra_keys}
+        email = customer.get("email")
+        if email:
+            keys.add(self.email_key(email))
+        entry = _CacheEntry(customer=customer, stored_at=time.monotonic())
+        with self._lock:
+            for key in keys:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats.evictions += 1
+
+    def invalidate(
+        self, customer_id: Optional[str] = None, email: Optional[str] = None
+    ):
+        with self._lock:
+            if customer_id:
+                self._entries.pop(self.id_key(customer_id), None)
+            if email:
+                self._entries.pop(self.email_key(email), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        customer_id: str,
+        refresh: Callable[[str], stripe.Customer],
+    ):
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        threading.Thread(
+            target=self._refresh,
+            args=(key, customer_id, refresh),
+            name="customer-cache-refresh",
+            daemon=True,
+        ).start()
+
+    def _refresh(
+        self,
+        key: str,
+        customer_id: str,
+        refresh: Callable[[str], stripe.Customer],
+    ):
+        try:
+            self.put(refresh(customer_id), key)
+            with self._lock:
+                self.stats.refreshes += 1
+        except Exception as e:
+            print(f"No se pudo refrescar el cliente {customer_id}: {e}")
+            with self._lock:
+                self.stats.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+
+_shared_customer_cache = CustomerCache()
+
+
+def get_shared_customer_cache() -> CustomerCache:
+    return _shared_customer_cache
@@ -0,0 +1,208 @@
+import fcntl
+import json
+import os
+import threading
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from commons import CustomerData, PaymentData, PaymentResponse
+
+QueuedPayment = tuple[CustomerData, PaymentData]
+
+_DONE = b"#"
+
+
+@dataclass
+class FailoverQueue:
+    """
+    Payments waiting for their provider to recover.
+
+    Without path the queue lives in memory. With path it lives only in a
+    JSONL file shared by every process using that path: each change is
+    made under an exclusive lock on <path>.lock and nothing is cached in
+    memory. At most max_size payments are kept.
+    """
+
+    max_size: int = 10_000
+    path: Optional[str | os.PathLike] = None
+    _entries: deque[QueuedPayment] = field(default_factory=deque, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+    _replay_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+
+    def __len__(self) -> int:
+        if self.path is None:
+            with self._lock:
+                return len(self._entries)
+        with self._locked():
+            return sum(1 for _ in _read_pending(self.path))
+
+    def __iter__(self) -> Iterator[QueuedPayment]:
+        if self.path is None:
+            with self._lock:
+                return iter(list(self._entries))
+        with self._locked():
+            return iter(list(_read_pending(self.path)))
+
+    def put(self, customer_data: CustomerData, payment_data: PaymentData):
+        """
+        Queues a payment, returning False when the queue is full.
+        """
+        if self.path is None:
+            with self._lock:
+                if len(self._entries) >= self.max_size:
+                    return False
+                self._entries.append((customer_data, payment_data))
+                return True
+        entry = {
+            "customer_data": customer_data.model_dump(mode="json"),
+            "payment_data": payment_data.model_dump(mode="json"),
+        }
+        with self._locked():
+            queued = sum(1 for _ in _read_pending(self.path))
+            if queued >= self.max_size:
+                return False
+            with open(self.path, "ab+") as queue_file:
+                _cut_partial_entry(queue_file)
+                queue_file.write(json.dumps(entry).encode() + b"\n")
+                queue_file.flush()
+                os.fsync(queue_file.fileno())
+        return True
+
+    def drain(self) -> list[QueuedPayment]:
+        """
+        Returns and forgets every queued payment.
+        """
+        if self.path is None:
+            with self._lock:
+                drained = list(self._entries)
+                self._entries.clear()
+            return drained
+        with self._locked():
+            drained = list(_read_pending(self.path))
+            if os.path.exists(self.path):
+                os.truncate(self.path, 0)
+        return drained
+
+    def replay(
+        self, charge: Callable[[CustomerData, PaymentData], PaymentResponse]
+    ) -> list[tuple[CustomerData, PaymentData, PaymentResponse]]:
+        """
+        Hands the queued payments to charge, oldest first, and removes each
+        one only once charge has returned for it.
+
+        A payment queued again by charge waits for the next replay. Only
+        one replay runs at a time, across processes for a file queue; the
+        others return nothing. After a crash, the payment being charged is
+        handed to charge again by the next replay.
+        """
+        if not self._replay_lock.acquire(blocking=False):
+            return []
+        try:
+            if self.path is None:
+                return self._replay_entries(charge)
+            return self._replay_file(charge)
+        finally:
+            self._replay_lock.release()
+
+    def _replay_entries(self, charge) -> list:
+        replayed = []
+        with self._lock:
+            count = len(self._entries)
+        for _ in range(count):
+            with self._lock:
+                if not self._entries:
+                    break
+                payment = self._entries[0]
+            response = charge(*payment)
+            with self._lock:
+                if self._entries and self._entries[0] is payment:
+                    self._entries.popleft()
+            replayed.append((*payment, response))
+        return replayed
+
+    def _replay_file(self, charge) -> list:
+        path = os.fspath(self.path)  # type: ignore
+        claimed = f"{path}.replaying"
+        with open(f"{path}.replay.lock", "a") as replay_lock:
+            try:
+                fcntl.flock(replay_lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return []
+            replayed = []
+            # A claimed file left by a crashed replay is finished first.
+            if os.path.exists(claimed):
+                replayed += _replay_claimed(claimed, charge)
+            with self._locked():
+                if not os.path.exists(path):
+                    return replayed
+                os.replace(path, claimed)
+            return replayed + _replay_claimed(claimed, charge)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _read_pending(path: str | os.PathLike) -> Iterator[QueuedPayment]:
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as queue_file:
+        for line in queue_file:
+            # Skips entries already replayed and one left half written by
+            # a crash.
+            if line.endswith(b"\n") and not line.startswith(_DONE):
+                yield _load(line)
+
+
+def _cut_partial_entry(queue_file):
+    """
+    Cuts off an entry left half written by a crash, so the next one starts
+    on its own line.
+    """
+    size = queue_file.seek(0, os.SEEK_END)
+    if not size:
+        return
+    queue_file.seek(-1, os.SEEK_END)
+    if queue_file.read(1) == b"\n":
+        return
+    queue_file.seek(0)
+    queue_file.truncate(queue_file.read().rfind(b"\n") + 1)
+
+
+def _replay_claimed(path: str, charge) -> list:
+    replayed = []
+    with open(path, "rb+") as queue_file:
+        while True:
+            offset = queue_file.tell()
+            line = queue_file.readline()
+            if not line:
+                break
+            if not line.endswith(b"\n") or line.startswith(_DONE):
+                continue
+            customer_data, payment_data = _load(line)
+            response = charge(customer_data, payment_data)
+            queue_file.seek(offset)
+            queue_file.write(_DONE)
+            queue_file.flush()
+            os.fsync(queue_file.fileno())
+            queue_file.seek(offset + len(line))
+            replayed.append((customer_data, payment_data, response))
+    os.remove(path)
+    return replayed
+
+
+def _load(line: bytes) -> QueuedPayment:
+    entry = json.loads(line)
+    return (
+        CustomerData.model_validate(entry["customer_data"]),
+        PaymentData.model_validate(entry["payment_data"]),
+    )
@@ -13,3 +13,11 @@ class PaymentProcessorProtocol(Protocol):
     def process_transaction(
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse: ...
+
+
+class AsyncPaymentProcessorProtocol(Protocol):
+    """Protocol for processing payments without blocking the event loop."""
+
+    async def process_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse: ...
@@ -0,0 +1,49 @@
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+
+@dataclass
+class PriceCache:
+    """
+    Caches the unit amount of Stripe prices for ttl seconds.
+
+    Prices rarely change, so a recurring setup only needs the amount it
+    charges, not a fresh copy of the price with every subscription.
+    """
+
+    ttl: float = 3600.0
+    _amounts: dict[str, tuple[int, float]] = field(
+        default_factory=dict, init=False
+    )
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def get(self, price_id: str) -> Optional[int]:
+        with self._lock:
+            cached = self._amounts.get(price_id)
+        if cached and time.monotonic() - cached[1] <= self.ttl:
+            return cached[0]
+        return None
+
+    def put(self, price_id: str, unit_amount: int):
+        with self._lock:
+            self._amounts[price_id] = (unit_amount, time.monotonic())
+
+    def get_or_load(self, price_id: str, load: Callable[[str], int]) -> int:
+        unit_amount = self.get(price_id)
+        if unit_amount is None:
+            unit_amount = load(price_id)
+            self.put(price_id, unit_amount)
+        return unit_amount
+
+    def clear(self):
+        with self._lock:
+            self._amounts.clear()
+
+
+_shared_price_cache = PriceCache()
+
+
+def get_shared_price_cache() -> PriceCache:
+    return _shared_price_cache
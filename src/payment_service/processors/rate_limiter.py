@@ -0,0 +1,223 @@
+import fcntl
+import os
+import struct
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from multiprocessing import resource_tracker, shared_memory
+from typing import Optional, Protocol
+
+from stripe.error import StripeError  # type: ignore
+
+DEFAULT_RATES = {
+    "charges": 25.0,
+    "refunds": 25.0,
+    "customers": 25.0,
+    "payment_methods": 25.0,
+    "subscriptions": 25.0,
+    "prices": 25.0,
+}
+
+_STATE = struct.Struct("dd")
+
+
+class RateLimitExceeded(StripeError):
+    """Raised when a call is shed by the client-side rate limiter."""
+
+
+class Bucket(Protocol):
+    def reserve(self, max_wait: float) -> Optional[float]: ...
+
+
+@dataclass
+class TokenBucket(Bucket):
+    """
+    Thread-safe token bucket refilled at rate tokens per second.
+    """
+
+    rate: float
+    burst: float
+    _tokens: float = field(init=False)
+    _updated_at: float = field(default_factory=time.monotonic, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        self._tokens = self.burst
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Takes a token, returning how long the caller must wait before using
+        it, or None when the wait would exceed max_wait.
+        """
+        with self._lock:
+            now = time.monotonic()
+            tokens, wait = _take(
+                self._tokens, self._updated_at, now, self.rate, self.burst
+            )
+            if wait > max_wait:
+                return None
+            self._tokens, self._updated_at = tokens, now
+            return wait
+
+
+@dataclass
+class SharedTokenBucket(Bucket):
+    """
+    Token bucket whose state lives in shared memory, so every process that
+    opens the same name draws from it.
+
+    Updates are serialized with a lock file. The segment outlives the
+    processes using it until unlink() is called.
+    """
+
+    name: str
+    rate: float
+    burst: float
+    _memory: shared_memory.SharedMemory = field(init=False)
+    _lock_file: int = field(init=False)
+
+    def __post_init__(self):
+        lock_path = os.path.join(tempfile.gettempdir(), f"{self.name}.lock")
+        self._lock_file = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        with self._locked():
+            try:
+                self._memory = shared_memory.SharedMemory(
+                    name=self.name, create=True, size=_STATE.size
+                )
+                _STATE.pack_into(
+                    self._memory.buf, 0, self.burst, time.monotonic()
+                )
+            except FileExistsError:
+                self._memory = shared_memory.SharedMemory(name=self.name)
+        # Other processes keep using the segment after this one exits.
+        resource_tracker.unregister(
+            self._memory._name,  # type: ignore
+            "shared_memory",
+        )
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        with self._locked():
+            now = time.monotonic()
+            tokens, updated_at = _STATE.unpack_from(self._memory.buf, 0)
+            tokens, wait = _take(
+                tokens, updated_at, now, self.rate, self.burst
+            )
+            if wait > max_wait:
+                return None
+            _STATE.pack_into(self._memory.buf, 0, tokens, now)
+            return wait
+
+    def unlink(self):
+        resource_tracker.register(
+            self._memory._name,  # type: ignore
+            "shared_memory",
+        )
+        self._memory.close()
+        self._memory.unlink()
+
+    def _locked(self):
+        return _FileLock(self._lock_file)
+
+
+class _FileLock:
+    def __init__(self, fd: int):
+        self.fd = fd
+
+    def __enter__(self):
+        fcntl.flock(self.fd, fcntl.LOCK_EX)
+
+    def __exit__(self, *exc_info):
+        fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+
+def _take(
+    tokens: float, updated_at: float, now: float, rate: float, burst: float
+) -> tuple[float, float]:
+    """
+    Refills the bucket up to now and takes one token, allowing the balance
+    to go negative. Returns the new balance and the wait for the token.
+    """
+    tokens = min(burst, tokens + (now - updated_at) * rate) - 1
+    wait = -tokens / rate if tokens < 0 else 0.0
+    return tokens, wait
+
+
+@dataclass
+class RateLimiter:
+    """
+    Client-side rate limiter with one token bucket per Stripe endpoint.
+
+    In "queue" mode a call waits up to max_wait for a token; in "shed"
+    mode, or when the wait would be longer, RateLimitExceeded is raised
+    before the request is sent. Endpoints without a rate are not limited.
+    With shared_name the buckets live in shared memory and are shared by
+    every worker process using that name.
+    """
+
+    rates: dict[str, float] = field(
+        default_factory=lambda: dict(DEFAULT_RATES)
+    )
+    burst: Optional[dict[str, float]] = None
+    mode: str = "queue"
+    max_wait: float = 2.0
+    shared_name: Optional[str] = None
+    _buckets: dict[str, Bucket] = field(default_factory=dict, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        if self.mode not in ("queue", "shed"):
+            raise ValueError(f"Modo de limitador desconocido: {self.mode}")
+
+    def acquire(self, endpoint: str):
+        bucket = self._bucket(endpoint)
+        if bucket is None:
+            return
+        max_wait = self.max_wait if self.mode == "queue" else 0.0
+        wait = bucket.reserve(max_wait)
+        if wait is None:
+            raise RateLimitExceeded(
+                f"Client-side rate limit reached for {endpoint}"
+            )
+        if wait > 0:
+            time.sleep(wait)
+
+    def _bucket(self, endpoint: str) -> Optional[Bucket]:
+        bucket = self._buckets.get(endpoint)
+        if bucket or endpoint not in self.rates:
+            return bucket
+        with self._lock:
+            if endpoint not in self._buckets:
+                rate = self.rates[endpoint]
+                burst = (self.burst or {}).get(endpoint, rate)
+                self._buckets[endpoint] = (
+                    SharedTokenBucket(
+                        name=f"{self.shared_name}-{endpoint}",
+                        rate=rate,
+                        burst=burst,
+                    )
+                    if self.shared_name
+                    else TokenBucket(rate=rate, burst=burst)
+                )
+            return self._buckets[endpoint]
+
+
+def rates_from_env() -> dict[str, float]:
+    """
+    Returns the rates set by STRIPE_RATE_LIMIT, in requests per second for
+    each Stripe endpoint. Without it no endpoint is limited.
+    """
+    rate = float(os.getenv("STRIPE_RATE_LIMIT") or 0)
+    if rate <= 0:
+        return {}
+    return {endpoint: rate for endpoint in DEFAULT_RATES}
+
+
+_shared_rate_limiter = RateLimiter(
+    rates=rates_from_env(),
+    shared_name=os.getenv("STRIPE_RATE_LIMIT_SHARED_NAME"),
+)
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    return _shared_rate_limiter
@@ -9,3 +9,11 @@ class RecurringPaymentProcessorProtocol(Protocol):
     def setup_recurring_payment(
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse: ...
+
+
+class AsyncRecurringPaymentProcessorProtocol(Protocol):
+    """Protocol for setting up recurring payments asynchronously."""
+
+    async def setup_recurring_payment(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse: ...
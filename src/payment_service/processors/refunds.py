@@ -1,3 +1,6 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Iterable, Optional
+
 from typing_extensions import Protocol
 
 from commons import PaymentResponse
@@ -7,3 +10,58 @@ class RefundProcessorProtocol(Protocol):
     """Protocol for processing refunds."""
 
     def refund_payment(self, transaction_id: str) -> PaymentResponse: ...
+
+    def refund_payments(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        on_refunded: Optional[Callable[[str, PaymentResponse], None]] = None,
+    ) -> list[PaymentResponse]:
+        """
+        Refunds several transactions, at most max_workers at a time.
+
+        Responses are returned in the order of transaction_ids; a refund
+        that raises is reported as a failed response. on_refunded is called
+        on the calling thread with each transaction id and its response as
+        soon as that refund completes.
+        """
+        transaction_ids = list(transaction_ids)
+        responses: list[Optional[PaymentResponse]] = [None] * len(
+            transaction_ids
+        )
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="refund"
+        ) as executor:
+            futures = {
+                executor.submit(self._safe_refund, transaction_id): index
+                for index, transaction_id in enumerate(transaction_ids)
+            }
+            try:
+                for future in as_completed(futures):
+                    index = futures[future]
+                    responses[index] = future.result()
+                    if on_refunded:
+                        on_refunded(transaction_ids[index], responses[index])
+            except BaseException:
+                # Refunds not started yet must not run unrecorded.
+                executor.shutdown(cancel_futures=True)
+                raise
+        return responses  # type: ignore
+
+    def _safe_refund(self, transaction_id: str) -> PaymentResponse:
+        try:
+            return self.refund_payment(transaction_id)
+        except Exception as e:
+            print(f"fallo en el reembolso {transaction_id}: {e}")
+            return PaymentResponse(
+                status="failed",
+                amount=0,
+                transaction_id=None,
+                message=str(e),
+            )
+
+
+class AsyncRefundProcessorProtocol(Protocol):
+    """Protocol for processing refunds asynchronously."""
+
+    async def refund_payment(self, transaction_id: str) -> PaymentResponse: ...
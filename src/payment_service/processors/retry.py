@@ -0,0 +1,129 @@
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Callable, TypeVar
+
+from stripe.error import (  # type: ignore
+    APIConnectionError,
+    APIError,
+    RateLimitError,
+    StripeError,
+)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_ATTEMPTS = {
+    "charges": 3,
+    "refunds": 3,
+    "customers": 3,
+    "payment_methods": 3,
+    "subscriptions": 2,
+    "prices": 3,
+}
+
+
+@dataclass
+class RetryBudget:
+    """
+    Caps retries to a share of the traffic.
+
+    Every first attempt deposits ratio tokens and every retry spends one,
+    so during an outage retries add at most ratio extra load instead of
+    multiplying it. min_tokens lets low traffic retry at all.
+    """
+
+    ratio: float = 0.1
+    min_tokens: float = 10.0
+    max_tokens: float = 100.0
+    tokens: float = field(default=10.0, init=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, init=False)
+
+    def __post_init__(self):
+        self.tokens = self.min_tokens
+
+    def record_request(self):
+        with self._lock:
+            self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+def is_retryable(error: StripeError) -> bool:
+    should_retry = (error.headers or {}).get("stripe-should-retry")
+    if should_retry is not None:
+        return should_retry == "true"
+    if isinstance(error, (APIConnectionError, RateLimitError, APIError)):
+        return True
+    return error.http_status == 409
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries transient Stripe errors with decorrelated-jitter backoff.
+
+    Attempts are limited per endpoint and by a shared retry budget. Calls
+    that create or modify objects get one idempotency key for all their
+    attempts, so a retried charge or refund is never applied twice.
+    """
+
+    max_attempts: dict[str, int] = field(
+        default_factory=lambda: dict(DEFAULT_MAX_ATTEMPTS)
+    )
+    default_max_attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 5.0
+    budget: RetryBudget = field(default_factory=RetryBudget)
+    sleep: Callable[[float], None] = time.sleep
+
+    def call(
+        self,
+        endpoint: str,
+        request: Callable[[dict], T],
+        idempotent_key: bool = True,
+    ) -> T:
+        """
+        Calls request(options) until it succeeds or the error is final.
+        """
+        options = {}
+        if idempotent_key:
+            options["idempotency_key"] = str(uuid.uuid4())
+        max_attempts = self.max_attempts.get(
+            endpoint, self.default_max_attempts
+        )
+        self.budget.record_request()
+        attempt = 1
+        delay = self.base_delay
+        while True:
+            try:
+                return request(options)
+            except StripeError as e:
+                if (
+                    attempt >= max_attempts
+                    or not is_retryable(e)
+                    or not self.budget.try_spend()
+                ):
+                    raise e
+                delay = min(
+                    self.max_delay, random.uniform(self.base_delay, delay * 3)
+                )
+                print(
+                    f"Reintentando {endpoint} en {delay:.2f}s "
+                    f"(intento {attempt}): {e}"
+                )
+                self.sleep(delay)
+                attempt += 1
+
+
+_shared_retry_policy = RetryPolicy()
+
+
+def get_shared_retry_policy() -> RetryPolicy:
+    return _shared_retry_policy
@@ -0,0 +1,138 @@
+import asyncio
+import importlib.util
+import os
+import threading
+import weakref
+from typing import Optional
+
+import requests
+import stripe
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+_ = load_dotenv()
+
+DEFAULT_POOL_SIZE = 32
+DEFAULT_CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+
+_default_clients: dict[str, stripe.StripeClient] = {}
+_default_async_clients: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, stripe.StripeClient
+] = weakref.WeakKeyDictionary()
+_default_clients_lock = threading.Lock()
+
+
+def object_id(value) -> Optional[str]:
+    """
+    Returns the id of a field that may hold an id or an expanded object.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    return value.get("id")
+
+
+def async_http_available() -> bool:
+    """
+    Tells whether httpx, which the async Stripe client needs, is installed.
+    """
+    return importlib.util.find_spec("httpx") is not None
+
+
+def _base_addresses(api_base: Optional[str]) -> dict:
+    api_base = api_base or os.getenv("STRIPE_API_BASE")
+    return {"api": api_base} if api_base else {}
+
+
+def create_stripe_client(
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+    pool_size: int = DEFAULT_POOL_SIZE,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    max_network_retries: int = 0,
+) -> stripe.StripeClient:
+    """
+    Creates a StripeClient backed by one keep-alive requests session.
+
+    The session's connection pool holds up to pool_size connections, so
+    threads sharing the client reuse open TLS connections instead of
+    paying a handshake per call. api_base (or STRIPE_API_BASE) points the
+    client to another server, such as a local stand-in.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1, pool_maxsize=pool_size, pool_block=True
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    http_client = stripe.RequestsClient(
+        timeout=(connect_timeout, read_timeout),  # type: ignore
+        session=session,
+    )
+    return stripe.StripeClient(
+        api_key or os.getenv("STRIPE_API_KEY", ""),
+        base_addresses=_base_addresses(api_base),  # type: ignore
+        http_client=http_client,
+        max_network_retries=max_network_retries,
+    )
+
+
+def create_async_stripe_client(
+    api_key: Optional[str] = None,
+    api_base: Optional[str] = None,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+    read_timeout: float = DEFAULT_READ_TIMEOUT,
+    max_network_retries: int = 0,
+) -> stripe.StripeClient:
+    """
+    Creates a StripeClient for the *_async methods, backed by one pooled
+    httpx.AsyncClient. Requires httpx to be installed.
+
+    The pool is bound to the event loop that first uses it, so the client
+    must not be shared across loops.
+    """
+    import httpx
+
+    http_client = stripe.HTTPXClient(
+        timeout=httpx.Timeout(read_timeout, connect=connect_timeout)
+    )
+    return stripe.StripeClient(
+        api_key or os.getenv("STRIPE_API_KEY", ""),
+        base_addresses=_base_addresses(api_base),  # type: ignore
+        http_client=http_client,
+        max_network_retries=max_network_retries,
+    )
+
+
+def get_default_stripe_client(
+    asynchronous: bool = False,
+) -> stripe.StripeClient:
+    """
+    Returns the client shared by every processor in the process, creating
+    it on first use.
+
+    Async clients are pooled per event loop, since their connections can
+    only be used from the loop that opened them: the async default is the
+    one of the running loop and is released with it. It can therefore
+    only be requested from a coroutine.
+    """
+    if asynchronous:
+        loop = asyncio.get_running_loop()
+        with _default_clients_lock:
+            client = _default_async_clients.get(loop)
+            if client is None:
+                client = _default_async_clients[loop] = (
+                    create_async_stripe_client()
+                )
+            return client
+
+    client = _default_clients.get("sync")
+    if client:
+        return client
+    with _default_clients_lock:
+        if "sync" not in _default_clients:
+            _default_clients["sync"] = create_stripe_client(
+                pool_size=int(os.getenv("STRIPE_POOL_SIZE", DEFAULT_POOL_SIZE))
+            )
+        return _default_clients["sync"]
@@ -1,33 +1,117 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Optional, TypeVar
 
 import stripe
 from dotenv import load_dotenv
 from stripe.error import StripeError  # type: ignore
 
 from commons import CustomerData, PaymentData, PaymentResponse
+from metrics import MetricsProtocol, get_default_metrics
 
+from .customer_cache import CustomerCache, get_shared_customer_cache
 from .payment import PaymentProcessorProtocol
+from .price_cache import PriceCache, get_shared_price_cache
 from .recurring import RecurringPaymentProcessorProtocol
 from .refunds import RefundProcessorProtocol
+from .rate_limiter import RateLimiter, get_shared_rate_limiter
+from .retry import RetryPolicy, get_shared_retry_policy
+from .stripe_client import get_default_stripe_client, object_id
 
 _ = load_dotenv()
 
+T = TypeVar("T")
 
+_lookup_executor = ThreadPoolExecutor(
+    max_workers=16, thread_name_prefix="stripe-lookup"
+)
+
+
+@dataclass
 class StripePaymentProcessor(
     PaymentProcessorProtocol,
     RefundProcessorProtocol,
     RecurringPaymentProcessorProtocol,
 ):
+    """
+    Payment processor backed by a long-lived StripeClient.
+
+    When no client is given, the pooled client shared by the whole process
+    is used, so processors created per payment still reuse connections.
+    Customer lookups go through a customer cache, every request waits for
+    the rate limiter and transient errors are retried by a retry policy;
+    all three are also shared by default. The shared rate limiter only
+    limits requests when STRIPE_RATE_LIMIT is set.
+
+    Subscriptions are created without expansions unless
+    subscription_expand asks for them, and only their id and status are
+    read from the response; the amount comes from the cached price.
+
+    Every attempt is timed into a stripe.<endpoint>.<operation> histogram
+    and failed attempts are counted by error type, excluding the time spent
+    waiting for the rate limiter.
+    """
+
+    client: Optional[stripe.StripeClient] = None
+    customer_cache: CustomerCache = field(
+        default_factory=get_shared_customer_cache
+    )
+    retry_policy: RetryPolicy = field(default_factory=get_shared_retry_policy)
+    rate_limiter: RateLimiter = field(default_factory=get_shared_rate_limiter)
+    price_cache: PriceCache = field(default_factory=get_shared_price_cache)
+    subscription_expand: list[str] = field(default_factory=list)
+    metrics: MetricsProtocol = field(default_factory=get_default_metrics)
+
+    @property
+    def stripe_client(self) -> stripe.StripeClient:
+        if self.client is None:
+            self.client = get_default_stripe_client()
+        return self.client
+
+    def _call(
+        self,
+        endpoint: str,
+        operation: str,
+        request: Callable[[dict], T],
+        idempotent_key: bool = True,
+    ) -> T:
+        """
+        Sends a request to a Stripe endpoint with rate limiting, retries
+        and metrics.
+        """
+        name = f"stripe.{endpoint}.{operation}"
+
+        def attempt(options: dict) -> T:
+            self.rate_limiter.acquire(endpoint)
+            started = time.perf_counter()
+            try:
+                return request(options)
+            except StripeError as e:
+                self.metrics.increment(f"{name}.errors.{type(e).__name__}")
+                raise
+            finally:
+                self.metrics.observe(name, time.perf_counter() - started)
+
+        return self.retry_policy.call(endpoint, attempt, idempotent_key)
+
     def process_transaction(
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse:
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
         try:
-            charge = stripe.Charge.create(
-                amount=payment_data.amount,
-                currency="usd",
-                source=payment_data.source,
-                description="Charge for " + customer_data.name,
+            charge = self._call(
+                "charges",
+                "create",
+                lambda options: self.stripe_client.charges.create(
+                    params={
+                        "amount": payment_data.amount,
+                        "currency": "usd",
+                        "source": payment_data.source,
+                        "description": "Charge for " + customer_data.name,
+                    },
+                    options=options,
+                ),
             )
             print("Payment successful")
             return PaymentResponse(
@@ -43,12 +127,18 @@ class StripePaymentProcessor(
                 amount=payment_data.amount,
                 transaction_id=None,
                 message=str(e),
+                error_type=type(e).__name__,
             )
 
     def refund_payment(self, transaction_id: str) -> PaymentResponse:
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
         try:
-            refund = stripe.Refund.create(charge=transaction_id)
+            refund = self._call(
+                "refunds",
+                "create",
+                lambda options: self.stripe_client.refunds.create(
+                    params={"charge": transaction_id}, options=options
+                ),
+            )
             print("Refund successful")
             return PaymentResponse(
                 status=refund["status"],
@@ -63,32 +153,35 @@ class StripePaymentProcessor(
                 amount=0,
                 transaction_id=None,
                 message=str(e),
+                error_type=type(e).__name__,
             )
 
     def setup_recurring_payment(
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse:
-        stripe.api_key = os.getenv("STRIPE_API_KEY")
         price_id = os.getenv("STRIPE_PRICE_ID", "")
         try:
-            customer = self._get_or_create_customer(customer_data)
-
-            payment_method = self._attach_payment_method(
-                customer.id, payment_data.source
+            payment_method_future = _lookup_executor.submit(
+                self._retrieve_payment_method, payment_data.source
+            )
+            amount_future = _lookup_executor.submit(
+                self.price_cache.get_or_load,
+                price_id,
+                self._retrieve_price_amount,
             )
+            customer, fresh = self._get_or_create_customer(customer_data)
+            payment_method = payment_method_future.result()
 
-            self._set_default_payment_method(customer.id, payment_method.id)
+            self._attach_payment_method(customer.id, payment_method)
 
-            subscription = stripe.Subscription.create(
-                customer=customer.id,
-                items=[
-                    {"price": price_id},
-                ],
-                expand=["latest_invoice.payment_intent"],
+            self._set_default_payment_method(
+                customer, payment_method.id, fresh
             )
 
+            amount = amount_future.result()
+            subscription = self._create_subscription(customer.id, price_id)
+
             print("Recurring payment setup successful")
-            amount = subscription["items"]["data"][0]["price"]["unit_amount"]
             return PaymentResponse(
                 status=subscription["status"],
                 amount=amount,
@@ -102,36 +195,132 @@ class StripePaymentProcessor(
                 amount=0,
                 transaction_id=None,
                 message=str(e),
+                error_type=type(e).__name__,
             )
 
     def _get_or_create_customer(
         self, customer_data: CustomerData
-    ) -> stripe.Customer:
+    ) -> tuple[stripe.Customer, bool]:
         """
         Creates a new customer in Stripe or retrieves an existing one.
+
+        Customers are looked up in the cache first, by id or by email. Also
+        returns whether the customer was loaded from Stripe by this call,
+        rather than served from the cache.
         """
-        if customer_data.customer_id:
-            customer = stripe.Customer.retrieve(customer_data.customer_id)
-            print(f"Customer retrieved: {customer.id}")
+        customer_id = customer_data.customer_id
+        email = customer_data.contact_info.email
+        if customer_id:
+            key = CustomerCache.id_key(customer_id)
+        elif email:
+            key = CustomerCache.email_key(email)
         else:
-            if not customer_data.contact_info.email:
-                raise ValueError("Email required for subscriptions")
-            customer = stripe.Customer.create(
-                name=customer_data.name, email=customer_data.contact_info.email
-            )
-            print(f"Customer created: {customer.id}")
+            raise ValueError("Email required for subscriptions")
+        loaded = False
+
+        def load() -> stripe.Customer:
+            nonlocal loaded
+            loaded = True
+            if customer_id:
+                return self._retrieve_customer(customer_id)
+            return self._create_customer(customer_data.name, email)
+
+        customer = self.customer_cache.get_or_load(
+            key, load, self._retrieve_customer
+        )
+        return customer, loaded
+
+    def _retrieve_customer(self, customer_id: str) -> stripe.Customer:
+        customer = self._call(
+            "customers",
+            "retrieve",
+            lambda options: self.stripe_client.customers.retrieve(
+                customer_id, options=options
+            ),
+            idempotent_key=False,
+        )
+        print(f"Customer retrieved: {customer.id}")
         return customer
 
+    def _create_customer(self, name: str, email: str) -> stripe.Customer:
+        customer = self._call(
+            "customers",
+            "create",
+            lambda options: self.stripe_client.customers.create(
+                params={"name": name, "email": email}, options=options
+            ),
+        )
+        print(f"Customer created: {customer.id}")
+        return customer
+
+    def _retrieve_payment_method(
+        self, payment_method_id: str
+    ) -> stripe.PaymentMethod:
+        return self._call(
+            "payment_methods",
+            "retrieve",
+            lambda options: self.stripe_client.payment_methods.retrieve(
+                payment_method_id, options=options
+            ),
+            idempotent_key=False,
+        )
+
+    def _retrieve_price_amount(self, price_id: str) -> int:
+        price = self._call(
+            "prices",
+            "retrieve",
+            lambda options: self.stripe_client.prices.retrieve(
+                price_id, options=options
+            ),
+            idempotent_key=False,
+        )
+        return price["unit_amount"]
+
+    def _create_subscription(self, customer_id: str, price_id: str) -> dict:
+        """
+        Creates a subscription and returns only its id and status.
+
+        The response is read as plain JSON instead of being turned into a
+        StripeObject tree, since nothing else in it is used.
+        """
+        params: dict = {
+            "customer": customer_id,
+            "items": [
+                {"price": price_id},
+            ],
+        }
+        if self.subscription_expand:
+            params["expand"] = self.subscription_expand
+        response = self._call(
+            "subscriptions",
+            "create",
+            lambda options: self.stripe_client.raw_request(
+                "post", "/v1/subscriptions", **params, **options
+            ),
+        )
+        subscription = response.data
+        return {"id": subscription["id"], "status": subscription["status"]}
+
     def _attach_payment_method(
-        self, customer_id: str, payment_source: str
+        self, customer_id: str, payment_method: stripe.PaymentMethod
     ) -> stripe.PaymentMethod:
         """
-        Attaches a payment method to a customer.
+        Attaches a payment method to a customer, unless it already is.
         """
-        payment_method = stripe.PaymentMethod.retrieve(payment_source)
-        stripe.PaymentMethod.attach(
-            payment_method.id,
-            customer=customer_id,
+        if object_id(payment_method.get("customer")) == customer_id:
+            print(
+                f"Payment method {payment_method.id} already attached to "
+                f"customer {customer_id}"
+            )
+            return payment_method
+        self._call(
+            "payment_methods",
+            "attach",
+            lambda options: self.stripe_client.payment_methods.attach(
+                payment_method.id,
+                params={"customer": customer_id},
+                options=options,
+            ),
         )
         print(
             f"Payment method {payment_method.id} attached to customer {customer_id}"
@@ -139,15 +328,33 @@ class StripePaymentProcessor(
         return payment_method
 
     def _set_default_payment_method(
-        self, customer_id: str, payment_method_id: str
+        self, customer: stripe.Customer, payment_method_id: str, fresh: bool
     ) -> None:
         """
-        Sets the default payment method for a customer.
+        Sets the default payment method for a customer, unless it already is.
+
+        Only a customer fresh from Stripe is trusted to tell; a cached one
+        may predate a change made outside the service, so it is always
+        updated.
         """
-        stripe.Customer.modify(
-            customer_id,
-            invoice_settings={
-                "default_payment_method": payment_method_id,
-            },
+        customer_id = customer.id
+        invoice_settings = customer.get("invoice_settings") or {}
+        default = object_id(invoice_settings.get("default_payment_method"))
+        if fresh and default == payment_method_id:
+            print(f"Default payment method already set for {customer_id}")
+            return
+        customer = self._call(
+            "customers",
+            "update",
+            lambda options: self.stripe_client.customers.update(
+                customer_id,
+                params={
+                    "invoice_settings": {
+                        "default_payment_method": payment_method_id,
+                    },
+                },
+                options=options,
+            ),
         )
+        self.customer_cache.put(customer)
         print(f"Default payment method set for customer {customer_id}")
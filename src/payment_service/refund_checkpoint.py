@@ -0,0 +1,58 @@
+import json
+import os
+from dataclasses import dataclass
+from typing import Iterable
+
+from commons import PaymentResponse
+
+
+@dataclass
+class RefundCheckpoint:
+    """
+    Append-only JSONL record of the refunds of a bulk run.
+
+    Each line holds a transaction id and its refund response, so an
+    interrupted run can be resumed without refunding the same transaction
+    twice.
+    """
+
+    path: str | os.PathLike
+
+    def load(self) -> dict[str, PaymentResponse]:
+        """
+        Returns the last recorded response of every transaction.
+
+        A truncated last line, left by a run killed mid-write, is cut off
+        so later records start on a line of their own.
+        """
+        completed: dict[str, PaymentResponse] = {}
+        if not os.path.exists(self.path):
+            return completed
+        with open(self.path, "rb+") as checkpoint_file:
+            for line in checkpoint_file:
+                if not line.endswith(b"\n"):
+                    checkpoint_file.truncate(
+                        checkpoint_file.tell() - len(line)
+                    )
+                    break
+                entry = json.loads(line)
+                completed[entry["transaction_id"]] = (
+                    PaymentResponse.model_validate(entry["response"])
+                )
+        return completed
+
+    def record(self, entries: Iterable[tuple[str, PaymentResponse]]):
+        lines = "".join(
+            json.dumps(
+                {
+                    "transaction_id": transaction_id,
+                    "response": response.model_dump(),
+                }
+            )
+            + "\n"
+            for transaction_id, response in entries
+        )
+        with open(self.path, "a") as checkpoint_file:
+            checkpoint_file.write(lines)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
@@ -1,7 +1,16 @@
+import json
+import os
+from concurrent.futures import Executor, Future
 from dataclasses import dataclass
-from typing import Optional, Self
+from typing import ClassVar, Iterable, Iterator, Optional, Self
 
-from commons import CustomerData, PaymentData, PaymentResponse, Request
+from commons import (
+    BatchResponse,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+    Request,
+)
 from loggers import TransactionLogger
 from notifiers import NotifierProtocol
 from processors import (
@@ -11,9 +20,14 @@ from processors import (
 )
 from validators import CustomerValidator, PaymentDataValidator
 from factory import PaymentProcessorFactory
+from ingestion import parse_record, read_records
 
 
 from service_protocol import PaymentServiceProtocol
+from pipeline import PaymentPipeline
+from side_effects import DeferredSideEffects
+from refund_checkpoint import RefundCheckpoint
+from admission import AdmissionController
 from listeners import ListenersManager
 from validators import ChainHandler
 
@@ -27,6 +41,11 @@ class PaymentService(PaymentServiceProtocol):
     listeners: ListenersManager
     refund_processor: Optional[RefundProcessorProtocol] = None
     recurring_processor: Optional[RecurringPaymentProcessorProtocol] = None
+    executor: Optional[Executor] = None
+    side_effects: Optional[DeferredSideEffects] = None
+    admission: Optional[AdmissionController] = None
+
+    batch_log_chunk_size: ClassVar[int] = 100
 
     @classmethod
     def create_with_payment_processor(
@@ -48,6 +67,59 @@ class PaymentService(PaymentServiceProtocol):
     def process_transaction(
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse:
+        if not self.admission:
+            self._validate(customer_data, payment_data)
+            return self._complete_transaction(customer_data, payment_data)
+
+        if not self.admission.try_acquire():
+            return AdmissionController.throttled_response(payment_data)
+        try:
+            self._validate(customer_data, payment_data)
+            return self._complete_transaction(customer_data, payment_data)
+        finally:
+            self.admission.release()
+
+    def submit_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]:
+        """
+        Validates in the calling thread and runs the charge and its side
+        effects on the executor.
+
+        When no executor was given, the bounded pool that
+        PaymentProcessorFactory keeps for the processor type is used. With
+        admission control, queued payments count as in flight and a
+        rejected payment gets an already resolved throttled response.
+        """
+        self._validate(customer_data, payment_data)
+        executor = self.executor or PaymentProcessorFactory.get_executor(
+            self.payment_processor
+        )
+        if not self.admission:
+            return executor.submit(
+                self._complete_transaction, customer_data, payment_data
+            )
+
+        admission = self.admission
+        if not admission.try_acquire():
+            future: Future[PaymentResponse] = Future()
+            future.set_result(
+                AdmissionController.throttled_response(payment_data)
+            )
+            return future
+        try:
+            future = executor.submit(
+                self._complete_transaction, customer_data, payment_data
+            )
+        except Exception:
+            admission.release()
+            raise
+        future.add_done_callback(lambda _: admission.release())
+        return future
+
+    def _validate(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ):
         try:
             request = Request(
                 customer_data=customer_data, payment_data=payment_data
@@ -57,9 +129,18 @@ class PaymentService(PaymentServiceProtocol):
         except Exception as e:
             print(f"fallo en las validaciones: {e}")
             raise e
+
+    def _complete_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> PaymentResponse:
         payment_response = self.payment_processor.process_transaction(
             customer_data, payment_data
         )
+        if self.side_effects:
+            self._defer_side_effects(
+                customer_data, payment_data, payment_response
+            )
+            return payment_response
         self.listeners.notifyAll(
             f"pago exitoso al evento: {payment_response.transaction_id}"
         )
@@ -69,6 +150,186 @@ class PaymentService(PaymentServiceProtocol):
         )
         return payment_response
 
+    def _defer_side_effects(
+        self,
+        customer_data: CustomerData,
+        payment_data: PaymentData,
+        payment_response: PaymentResponse,
+    ):
+        side_effects: DeferredSideEffects = self.side_effects  # type: ignore
+        event = f"pago exitoso al evento: {payment_response.transaction_id}"
+        # One task per listener, so a retry does not notify again the
+        # listeners that already got the event.
+        for listener in list(self.listeners.listeners):
+            side_effects.submit(
+                "listeners",
+                lambda listener=listener: listener.notify(event),
+            )
+        side_effects.submit(
+            "notifier",
+            lambda: self.notifier.send_confirmation(customer_data),
+        )
+        side_effects.submit(
+            "logger",
+            lambda: self.logger.log_transaction(
+                customer_data, payment_data, payment_response
+            ),
+        )
+
+    def process_batch(
+        self, payments: Iterable[tuple[CustomerData, PaymentData]]
+    ) -> BatchResponse:
+        """
+        Processes many payments as one unit.
+
+        A failing item is reported as a failed response instead of aborting
+        the batch, and a failing confirmation does not affect its payment.
+        Log lines are written in chunks of batch_log_chunk_size as the batch
+        goes, so every charge made is logged even if the batch is cut
+        short. The listeners are notified once with the batch summary.
+        """
+        batch = BatchResponse()
+        processed = []
+        try:
+            for customer_data, payment_data in payments:
+                try:
+                    request = Request.model_construct(
+                        customer_data=customer_data, payment_data=payment_data
+                    )
+                    self.validators.handle(request=request)
+                    payment_response = (
+                        self.payment_processor.process_transaction(
+                            customer_data, payment_data
+                        )
+                    )
+                except Exception as e:
+                    print(f"fallo en el pago del lote: {e}")
+                    payment_response = PaymentResponse(
+                        status="failed",
+                        amount=payment_data.amount,
+                        transaction_id=None,
+                        message=str(e),
+                    )
+                else:
+                    try:
+                        self.notifier.send_confirmation(customer_data)
+                    except Exception as e:
+                        print(f"fallo en la confirmación del lote: {e}")
+                batch.add(payment_response)
+                processed.append(
+                    (customer_data, payment_data, payment_response)
+                )
+                if len(processed) >= self.batch_log_chunk_size:
+                    chunk, processed = processed, []
+                    self.logger.log_transactions(chunk)
+        finally:
+            self.logger.log_transactions(processed)
+
+        self.listeners.notifyAll(
+            f"lote procesado: {batch.succeeded} exitosos, "
+            f"{batch.queued} en cola, {batch.failed} fallidos"
+        )
+        return batch
+
+    def process_stream(
+        self,
+        records: Iterable[str | dict | tuple[CustomerData, PaymentData]]
+        | str
+        | os.PathLike,
+    ) -> Iterator[PaymentResponse]:
+        """
+        Lazily processes payment records, yielding one response per record.
+
+        records may be a path to a JSONL or CSV file, or any iterable of JSON
+        lines, raw records or (CustomerData, PaymentData) pairs. Only the
+        record being processed is held in memory. Invalid records, including
+        malformed lines, and failed charges yield a failed response instead
+        of stopping the stream. Once a card is charged its response is
+        yielded and logged even if a confirmation or listener fails.
+        """
+        if isinstance(records, (str, os.PathLike)):
+            records = read_records(records)
+        for record in records:
+            payment_data = None
+            try:
+                if isinstance(record, str):
+                    record = json.loads(record)
+                if isinstance(record, dict):
+                    customer_data, payment_data = parse_record(record)
+                else:
+                    customer_data, payment_data = record
+                self._validate(customer_data, payment_data)
+            except Exception as e:
+                print(f"fallo en el registro: {e}")
+                yield self._failed_response(payment_data, e)
+                continue
+
+            if self.admission and not self.admission.try_acquire():
+                yield AdmissionController.throttled_response(payment_data)
+                continue
+            try:
+                payment_response = self.payment_processor.process_transaction(
+                    customer_data, payment_data
+                )
+            except Exception as e:
+                print(f"fallo en el pago del registro: {e}")
+                yield self._failed_response(payment_data, e)
+                continue
+            finally:
+                if self.admission:
+                    self.admission.release()
+            self._settle_charge(customer_data, payment_data, payment_response)
+            yield payment_response
+
+    def _settle_charge(
+        self,
+        customer_data: CustomerData,
+        payment_data: PaymentData,
+        payment_response: PaymentResponse,
+    ):
+        """
+        Runs the side effects of a charge that was already made. The log
+        line is written first, and a failing side effect is reported
+        without stopping the others.
+        """
+        if self.side_effects:
+            self._defer_side_effects(
+                customer_data, payment_data, payment_response
+            )
+            return
+        side_effects = (
+            lambda: self.logger.log_transaction(
+                customer_data, payment_data, payment_response
+            ),
+            lambda: self.listeners.notifyAll(
+                f"pago exitoso al evento: {payment_response.transaction_id}"
+            ),
+            lambda: self.notifier.send_confirmation(customer_data),
+        )
+        for side_effect in side_effects:
+            try:
+                side_effect()
+            except Exception as e:
+                transaction_id = payment_response.transaction_id
+                print(f"fallo tras el pago {transaction_id}: {e}")
+
+    @staticmethod
+    def _failed_response(
+        payment_data: Optional[PaymentData], error: Exception
+    ) -> PaymentResponse:
+        return PaymentResponse(
+            status="failed",
+            amount=payment_data.amount if payment_data else 0,
+            transaction_id=None,
+            message=str(error),
+        )
+
+    def create_pipeline(self, **kwargs) -> "PaymentPipeline":
+        """
+        Returns a staged pipeline running this service's components.
+        """
+        return PaymentPipeline(service=self, **kwargs)
+
     def process_refund(self, transaction_id: str):
         if not self.refund_processor:
             raise Exception("this processor does not support refunds")
@@ -76,6 +337,71 @@ class PaymentService(PaymentServiceProtocol):
         self.logger.log_refund(transaction_id, refund_response)
         return refund_response
 
+    def process_refunds(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str | os.PathLike] = None,
+    ) -> BatchResponse:
+        """
+        Refunds many transactions with at most max_workers in flight.
+
+        Transactions are refunded chunk by chunk and each chunk is logged
+        with a single write. With checkpoint_path, every refund is recorded
+        as soon as it completes, so a rerun with the same path skips the
+        refunds that already succeeded and reuses their responses. Each
+        transaction is refunded at most once per run; the batch keeps one
+        response per entry of transaction_ids, in their order, repeating
+        the response of a duplicated id.
+        """
+        if not self.refund_processor:
+            raise Exception("this processor does not support refunds")
+        checkpoint = None
+        completed: dict[str, PaymentResponse] = {}
+        if checkpoint_path:
+            checkpoint = RefundCheckpoint(checkpoint_path)
+            completed = checkpoint.load()
+
+        batch = BatchResponse()
+        attempted: set[str] = set()
+        transaction_ids = list(transaction_ids)
+        for start in range(0, len(transaction_ids), chunk_size):
+            chunk = transaction_ids[start : start + chunk_size]
+            pending = [
+                transaction_id
+                for transaction_id in dict.fromkeys(chunk)
+                if transaction_id not in attempted
+                and not self._refund_succeeded(completed.get(transaction_id))
+            ]
+            attempted.update(pending)
+            refunded: list[tuple[str, PaymentResponse]] = []
+
+            def record(transaction_id: str, response: PaymentResponse):
+                if checkpoint:
+                    checkpoint.record([(transaction_id, response)])
+                refunded.append((transaction_id, response))
+
+            try:
+                self.refund_processor.refund_payments(
+                    pending, max_workers=max_workers, on_refunded=record
+                )
+            finally:
+                self.logger.log_refunds(refunded)
+            completed.update(refunded)
+            for transaction_id in chunk:
+                batch.add(completed[transaction_id])
+
+        self.listeners.notifyAll(
+            f"reembolsos procesados: {batch.succeeded} exitosos, "
+            f"{batch.failed} fallidos"
+        )
+        return batch
+
+    @staticmethod
+    def _refund_succeeded(response: Optional[PaymentResponse]) -> bool:
+        return response is not None and response.status != "failed"
+
     def setup_recurring(
         self, customer_data: CustomerData, payment_data: PaymentData
     ):
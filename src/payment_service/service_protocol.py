@@ -1,7 +1,14 @@
+import os
+from concurrent.futures import Future
 from typing import Protocol
-from typing import Optional, Self
+from typing import Iterable, Optional, Self
 
-from commons import CustomerData, PaymentData, PaymentResponse
+from commons import (
+    BatchResponse,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+)
 from loggers import TransactionLogger
 from notifiers import NotifierProtocol
 from processors import (
@@ -27,8 +34,24 @@ class PaymentServiceProtocol(Protocol):
         self, customer_data: CustomerData, payment_data: PaymentData
     ) -> PaymentResponse: ...
 
+    def submit_transaction(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]: ...
+
+    def process_batch(
+        self, payments: Iterable[tuple[CustomerData, PaymentData]]
+    ) -> BatchResponse: ...
+
     def process_refund(self, transaction_id: str): ...
 
+    def process_refunds(
+        self,
+        transaction_ids: Iterable[str],
+        max_workers: int = 8,
+        chunk_size: int = 500,
+        checkpoint_path: Optional[str | os.PathLike] = None,
+    ) -> BatchResponse: ...
+
     def setup_recurring(
         self, customer_data: CustomerData, payment_data: PaymentData
     ): ...
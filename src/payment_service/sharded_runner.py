@@ -0,0 +1,245 @@
+import hashlib
+import itertools
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Optional, Self
+
+from builder import PaymentServiceBuilder
+from commons import CustomerData, PaymentData, PaymentResponse
+
+
+def shard_key(customer_data: CustomerData) -> str:
+    """
+    Returns the value used to route a customer to a worker.
+    """
+    contact_info = customer_data.contact_info
+    return (
+        customer_data.customer_id
+        or contact_info.email
+        or contact_info.phone
+        or customer_data.name
+    )
+
+
+def _worker_loop(inbox, outbox):
+    while True:
+        job = inbox.get()
+        if job is None:
+            break
+        job_id, customer_data, payment_data = job
+        try:
+            service = PaymentServiceBuilder.build_for(
+                customer_data, payment_data
+            )
+            response = service.process_transaction(customer_data, payment_data)
+            outbox.put((job_id, response, None))
+        except Exception as e:
+            outbox.put((job_id, None, RuntimeError(str(e))))
+
+
+@dataclass
+class ShardedPaymentRunner:
+    """
+    Runs payments on several worker processes, each one building its own
+    PaymentService.
+
+    Payments are routed by a stable hash of the customer, so every payment
+    of the same customer is handled in order by the same worker. Workers
+    are checked every health_check_interval seconds; the pending payments
+    of a worker that died, e.g. killed for running out of memory, fail.
+    """
+
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    queue_size: int = 1024
+    start_method: str = "spawn"
+    health_check_interval: float = 1.0
+    _inboxes: list = field(default_factory=list, init=False)
+    _processes: list = field(default_factory=list, init=False)
+    _outbox: Optional[multiprocessing.Queue] = field(default=None, init=False)
+    _collector: Optional[threading.Thread] = field(default=None, init=False)
+    _pending: dict[int, tuple[int, Future]] = field(
+        default_factory=dict, init=False
+    )
+    _pending_lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False
+    )
+    _job_ids: itertools.count = field(
+        default_factory=itertools.count, init=False
+    )
+
+    def start(self) -> Self:
+        if self._processes:
+            return self
+        context = multiprocessing.get_context(self.start_method)
+        self._outbox = context.Queue()
+        for index in range(self.workers):
+            inbox = context.Queue(maxsize=self.queue_size)
+            process = context.Process(
+                target=_worker_loop,
+                args=(inbox, self._outbox),
+                name=f"payment-shard-{index}",
+                daemon=True,
+            )
+            process.start()
+            self._inboxes.append(inbox)
+            self._processes.append(process)
+        self._collector = threading.Thread(
+            target=self._collect_results,
+            name="payment-shard-results",
+            daemon=True,
+        )
+        self._collector.start()
+        return self
+
+    def shard_for(self, customer_data: CustomerData) -> int:
+        digest = hashlib.blake2b(
+            shard_key(customer_data).encode(), digest_size=8
+        ).digest()
+        return int.from_bytes(digest, "big") % self.workers
+
+    def submit(
+        self, customer_data: CustomerData, payment_data: PaymentData
+    ) -> Future[PaymentResponse]:
+        if not self._processes:
+            raise RuntimeError("El runner no ha sido iniciado")
+        job_id = next(self._job_ids)
+        future: Future[PaymentResponse] = Future()
+        shard = self.shard_for(customer_data)
+        with self._pending_lock:
+            self._pending[job_id] = (shard, future)
+        if not self._put(shard, (job_id, customer_data, payment_data)):
+            self._fail_jobs({shard}, self._worker_error(shard))
+        return future
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Waits for the queued payments to finish and stops the workers.
+
+        Workers still running after timeout seconds are killed and
+        their pending payments fail.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for shard in range(len(self._inboxes)):
+            self._put(shard, None, deadline)
+        for process in self._processes:
+            process.join(_remaining(deadline))
+            if process.is_alive():
+                process.kill()
+                process.join()
+        if self._outbox and self._collector:
+            self._outbox.put(None)
+            self._collector.join()
+        self._inboxes.clear()
+        self._processes.clear()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _put(
+        self,
+        shard: int,
+        job: Optional[tuple],
+        deadline: Optional[float] = None,
+    ) -> bool:
+        """
+        Queues job for a shard, giving up when its worker is dead or the
+        deadline passes while the inbox is full.
+        """
+        process = self._processes[shard]
+        while process.is_alive():
+            wait = self.health_check_interval
+            if deadline is not None:
+                wait = min(wait, _remaining(deadline))  # type: ignore
+            try:
+                self._inboxes[shard].put(job, timeout=wait)
+                return True
+            except queue.Full:
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+        return False
+
+    def _collect_results(self):
+        checked_at = time.monotonic()
+        while True:
+            try:
+                result = self._outbox.get(  # type: ignore
+                    timeout=self.health_check_interval
+                )
+            except queue.Empty:
+                result = ()
+            if result is None:
+                break
+            if result:
+                self._resolve(result)
+            if time.monotonic() - checked_at >= self.health_check_interval:
+                self._fail_dead_workers()
+                checked_at = time.monotonic()
+        # Nothing can answer the payments still pending once every worker
+        # has stopped.
+        self._fail_jobs(
+            set(range(self.workers)),
+            RuntimeError("El runner se cerró antes de procesar el pago"),
+        )
+
+    def _resolve(self, result: tuple):
+        job_id, response, error = result
+        with self._pending_lock:
+            _, future = self._pending.pop(job_id, (None, None))
+        if future is None:
+            return
+        if error:
+            future.set_exception(error)
+        else:
+            future.set_result(response)
+
+    def _fail_dead_workers(self):
+        dead = [
+            shard
+            for shard, process in enumerate(self._processes)
+            if not process.is_alive()
+        ]
+        if not dead:
+            return
+        # Results sent by a worker before it exited are already queued.
+        while True:
+            try:
+                result = self._outbox.get_nowait()  # type: ignore
+            except queue.Empty:
+                break
+            if result is None:
+                self._outbox.put(None)  # type: ignore
+                break
+            self._resolve(result)
+        for shard in dead:
+            self._fail_jobs({shard}, self._worker_error(shard))
+
+    def _fail_jobs(self, shards: set[int], error: Exception):
+        with self._pending_lock:
+            job_ids = [
+                job_id
+                for job_id, (shard, _) in self._pending.items()
+                if shard in shards
+            ]
+            futures = [self._pending.pop(job_id)[1] for job_id in job_ids]
+        for future in futures:
+            future.set_exception(error)
+
+    def _worker_error(self, shard: int) -> RuntimeError:
+        process = self._processes[shard]
+        return RuntimeError(
+            f"El proceso {process.name} terminó con código {process.exitcode}"
+        )
+
+
+def _remaining(deadline: Optional[float]) -> Optional[float]:
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
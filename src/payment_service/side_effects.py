@@ -0,0 +1,129 @@
+import atexit
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from queue import Empty, Queue
+from typing import Callable, Optional, Self
+
+_STOP = object()
+
+
+@dataclass
+class DeferredTask:
+    name: str
+    action: Callable[[], None]
+    attempts: int = 0
+
+
+@dataclass
+class DeferredSideEffects:
+    """
+    Runs post-charge side effects (listeners, notifier, logger) on a
+    background thread.
+
+    A failing task is retried with exponential backoff up to max_attempts
+    and then moved to failed; failed tasks are only kept in memory. Retries
+    wait on a timer instead of blocking the thread, so one failing side
+    effect does not hold back the others. At most max_pending tasks,
+    retries included, wait at a time; submit() blocks while the limit is
+    reached. Pending tasks are run before the interpreter exits.
+    """
+
+    max_attempts: int = 5
+    retry_delay: float = 0.1
+    max_retry_delay: float = 5.0
+    max_pending: int = 10_000
+    failed: list[DeferredTask] = field(default_factory=list, init=False)
+    _queue: Queue = field(default_factory=Queue, init=False)
+    _retries: list[tuple[float, int, DeferredTask]] = field(
+        default_factory=list, init=False
+    )
+    _retry_order: itertools.count = field(
+        default_factory=itertools.count, init=False
+    )
+    _slots: threading.Semaphore = field(init=False)
+    _unfinished: int = field(default=0, init=False)
+    _done: threading.Condition = field(
+        default_factory=threading.Condition, init=False
+    )
+    _thread: Optional[threading.Thread] = field(default=None, init=False)
+
+    def __post_init__(self):
+        self._slots = threading.Semaphore(self.max_pending)
+
+    def start(self) -> Self:
+        if self._thread:
+            return self
+        self._thread = threading.Thread(
+            target=self._run, name="deferred-side-effects", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+        return self
+
+    def submit(self, name: str, action: Callable[[], None]):
+        if not self._thread:
+            self.start()
+        self._slots.acquire()
+        with self._done:
+            self._unfinished += 1
+        self._queue.put(DeferredTask(name=name, action=action))
+
+    def pending(self) -> int:
+        return self._unfinished
+
+    def flush(self):
+        """
+        Blocks until every submitted task has run or exhausted its retries.
+        """
+        with self._done:
+            self._done.wait_for(lambda: not self._unfinished)
+
+    def close(self):
+        if not self._thread:
+            return
+        self.flush()
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._thread = None
+        atexit.unregister(self.close)
+
+    def _run(self):
+        while True:
+            timeout = None
+            if self._retries:
+                timeout = max(0.0, self._retries[0][0] - time.monotonic())
+            try:
+                task = self._queue.get(timeout=timeout)
+            except Empty:
+                task = None
+            if task is _STOP:
+                break
+            if task:
+                self._execute(task)
+            while self._retries and self._retries[0][0] <= time.monotonic():
+                self._execute(heapq.heappop(self._retries)[2])
+
+    def _execute(self, task: DeferredTask):
+        task.attempts += 1
+        try:
+            task.action()
+        except Exception as e:
+            print(f"fallo en {task.name} (intento {task.attempts}): {e}")
+            if task.attempts < self.max_attempts:
+                delay = min(
+                    self.retry_delay * 2 ** (task.attempts - 1),
+                    self.max_retry_delay,
+                )
+                heapq.heappush(
+                    self._retries,
+                    (time.monotonic() + delay, next(self._retry_order), task),
+                )
+                return
+            self.failed.append(task)
+        self._slots.release()
+        with self._done:
+            self._unfinished -= 1
+            self._done.notify_all()
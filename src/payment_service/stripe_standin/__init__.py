@@ -0,0 +1,4 @@
+from .latency import LatencyModel
+from .server import StripeStandIn, StandInConfig
+
+__all__ = ["LatencyModel", "StripeStandIn", "StandInConfig"]
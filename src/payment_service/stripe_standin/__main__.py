@@ -0,0 +1,51 @@
+import argparse
+
+from .latency import LatencyModel
+from .server import StandInConfig, StripeStandIn
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Stripe API"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=12111)
+    parser.add_argument(
+        "--latency",
+        default="none",
+        help='e.g. "fixed:0.05", "uniform:0.02:0.1", "lognormal:0.08:0.5"',
+    )
+    parser.add_argument(
+        "--endpoint-latency",
+        action="append",
+        default=[],
+        metavar="ENDPOINT=SPEC",
+        help='per endpoint override, e.g. "subscriptions=fixed:0.3"',
+    )
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0)
+    parser.add_argument("--rate-limit-burst", type=int, default=100)
+    args = parser.parse_args()
+
+    endpoint_latency = {}
+    for override in args.endpoint_latency:
+        endpoint, spec = override.split("=", 1)
+        endpoint_latency[endpoint] = LatencyModel.parse(spec)
+
+    config = StandInConfig(
+        latency=LatencyModel.parse(args.latency),
+        endpoint_latency=endpoint_latency,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        rate_limit_burst=args.rate_limit_burst,
+    )
+    server = StripeStandIn(config=config, host=args.host, port=args.port)
+    print(f"Stripe stand-in listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+import math
+import random
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """
+    Latency distribution of a stand-in endpoint, in seconds.
+
+    kind is one of "none", "fixed" (a), "uniform" (a to b) or "lognormal"
+    (median a, sigma b).
+    """
+
+    kind: str = "none"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """
+        Parses specs like "fixed:0.05", "uniform:0.02:0.1" or
+        "lognormal:0.08:0.5".
+        """
+        kind, *values = spec.split(":")
+        numbers = [float(value) for value in values] + [0.0, 0.0]
+        model = cls(kind=kind, a=numbers[0], b=numbers[1])
+        if kind not in ("none", "fixed", "uniform", "lognormal"):
+            raise ValueError(f"Distribución de latencia desconocida: {kind}")
+        if kind == "lognormal" and model.a <= 0:
+            raise ValueError("La mediana lognormal debe ser positiva")
+        return model
+
+    def sample(self) -> float:
+        match self.kind:
+            case "fixed":
+                return self.a
+            case "uniform":
+                return random.uniform(self.a, self.b)
+            case "lognormal":
+                return random.lognormvariate(math.log(self.a), self.b)
+            case _:
+                return 0.0
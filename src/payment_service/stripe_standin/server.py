@@ -0,0 +1,410 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Self
+from urllib.parse import parse_qsl, urlparse
+
+from .latency import LatencyModel
+
+DEFAULT_UNIT_AMOUNT = 1000
+
+
+@dataclass
+class StandInConfig:
+    """
+    Behaviour of the stand-in server.
+
+    endpoint_latency overrides latency per endpoint ("charges", "refunds",
+    "customers", "payment_methods", "subscriptions", "prices"). error_rate is
+    the share of requests answered with a 500, and rate_limit the sustained
+    requests per second (with rate_limit_burst) above which requests get a
+    429. A rate_limit of 0 disables rate limiting.
+
+    Only the max_objects most recently used objects and the
+    max_idempotent_responses most recent idempotent responses are kept,
+    so long load runs use bounded memory.
+    """
+
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    endpoint_latency: dict[str, LatencyModel] = field(default_factory=dict)
+    error_rate: float = 0.0
+    rate_limit: float = 0.0
+    rate_limit_burst: int = 100
+    unit_amount: int = DEFAULT_UNIT_AMOUNT
+    max_objects: int = 100_000
+    max_idempotent_responses: int = 100_000
+
+
+@dataclass
+class _LruStore[V]:
+    """
+    Thread-safe mapping that keeps the max_size most recently used entries.
+    """
+
+    max_size: int
+    _entries: OrderedDict[str, V] = field(default_factory=OrderedDict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __setitem__(self, key: str, value: V):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[V]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def setdefault(self, key: str, default: V) -> V:
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = default
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+
+@dataclass
+class _StandInState:
+    config: StandInConfig
+    objects: _LruStore[dict] = field(init=False)
+    idempotent_responses: _LruStore[tuple[int, dict]] = field(init=False)
+    in_flight_keys: set[str] = field(default_factory=set)
+    requests: dict[str, int] = field(default_factory=dict)
+    tokens: float = 0.0
+    refilled_at: float = field(default_factory=time.monotonic)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def __post_init__(self):
+        self.tokens = float(self.config.rate_limit_burst)
+        self.objects = _LruStore(self.config.max_objects)
+        self.idempotent_responses = _LruStore(
+            self.config.max_idempotent_responses
+        )
+
+    def begin_idempotent(
+        self, key: str
+    ) -> tuple[bool, Optional[tuple[int, dict]]]:
+        """
+        Claims an idempotency key. Returns whether the caller owns the key
+        and, when the request was already answered, its response.
+        """
+        with self.lock:
+            if key in self.in_flight_keys:
+                return False, None
+            cached = self.idempotent_responses.get(key)
+            if cached is None:
+                self.in_flight_keys.add(key)
+            return cached is None, cached
+
+    def finish_idempotent(
+        self, key: str, response: Optional[tuple[int, dict]]
+    ):
+        # The response is stored before the key is released, so a retry
+        # either waits for it or gets it.
+        if response is not None:
+            self.idempotent_responses[key] = response
+        with self.lock:
+            self.in_flight_keys.discard(key)
+
+    def admit(self) -> bool:
+        if self.config.rate_limit <= 0:
+            return True
+        with self.lock:
+            now = time.monotonic()
+            refill = (now - self.refilled_at) * self.config.rate_limit
+            self.tokens = min(
+                float(self.config.rate_limit_burst), self.tokens + refill
+            )
+            self.refilled_at = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def count(self, endpoint: str):
+        with self.lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+
+def _new_id(prefix: str) -> str:
+    return f"{prefix}_{uuid.uuid4().hex[:24]}"
+
+
+def _error(status: int, error_type: str, message: str, code=None):
+    error = {"type": error_type, "message": message}
+    if code:
+        error["code"] = code
+    return status, {"error": error}
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    state: _StandInState
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        pass
+
+    def _dispatch(self, method: str):
+        path = urlparse(self.path).path.strip("/").split("/")
+        length = int(self.headers.get("Content-Length") or 0)
+        params = dict(parse_qsl(self.rfile.read(length).decode()))
+        endpoint = path[1] if len(path) > 1 else ""
+        config = self.state.config
+        self.state.count(endpoint)
+
+        latency = config.endpoint_latency.get(endpoint, config.latency)
+        time.sleep(latency.sample())
+
+        idempotency_key = self.headers.get("Idempotency-Key")
+        if not idempotency_key or method != "POST":
+            self._send(*self._respond(method, path, params))
+            return
+        owner, cached = self.state.begin_idempotent(idempotency_key)
+        if cached:
+            self._send(*cached)
+            return
+        if not owner:
+            self._send(
+                *_error(
+                    409,
+                    "idempotency_error",
+                    "There is currently another in-progress request using "
+                    "this Idempotent Key.",
+                )
+            )
+            return
+        response = None
+        try:
+            status, body = self._respond(method, path, params)
+            if status < 500 and status != 429:
+                response = status, body
+        finally:
+            self.state.finish_idempotent(idempotency_key, response)
+        self._send(status, body)
+
+    def _respond(
+        self, method: str, path: list[str], params: dict
+    ) -> tuple[int, dict]:
+        if not self.state.admit():
+            return _error(
+                429,
+                "invalid_request_error",
+                "Too many requests hit the API too quickly.",
+                code="rate_limit",
+            )
+        if random.random() < self.state.config.error_rate:
+            return _error(500, "api_error", "Simulated API error")
+        return self._route(method, path[1:], params)
+
+    def _route(self, method: str, path: list[str], params: dict):
+        objects = self.state.objects
+        match method, path:
+            case "POST", ["charges"]:
+                return 200, self._store(
+                    {
+                        "id": _new_id("ch"),
+                        "object": "charge",
+                        "amount": int(params.get("amount", 0)),
+                        "currency": params.get("currency", "usd"),
+                        "description": params.get("description"),
+                        "status": "succeeded",
+                    }
+                )
+            case "POST", ["refunds"]:
+                charge = objects.get(params.get("charge", ""))
+                if not charge:
+                    return self._missing("charge", params.get("charge"))
+                return 200, self._store(
+                    {
+                        "id": _new_id("re"),
+                        "object": "refund",
+                        "amount": charge["amount"],
+                        "charge": charge["id"],
+                        "status": "succeeded",
+                    }
+                )
+            case "POST", ["customers"]:
+                return 200, self._store(
+                    {
+                        "id": _new_id("cus"),
+                        "object": "customer",
+                        "name": params.get("name"),
+                        "email": params.get("email"),
+                        "invoice_settings": {"default_payment_method": None},
+                    }
+                )
+            case "GET", ["customers", customer_id]:
+                customer = objects.get(customer_id)
+                if not customer:
+                    return self._missing("customer", customer_id)
+                return 200, customer
+            case "POST", ["customers", customer_id]:
+                customer = objects.get(customer_id)
+                if not customer:
+                    return self._missing("customer", customer_id)
+                default = params.get(
+                    "invoice_settings[default_payment_method]"
+                )
+                if default:
+                    customer["invoice_settings"]["default_payment_method"] = (
+                        default
+                    )
+                return 200, customer
+            case "GET", ["payment_methods", payment_method_id]:
+                return 200, objects.setdefault(
+                    payment_method_id,
+                    {
+                        "id": payment_method_id,
+                        "object": "payment_method",
+                        "type": "card",
+                        "customer": None,
+                    },
+                )
+            case "POST", ["payment_methods", payment_method_id, "attach"]:
+                payment_method = objects.get(payment_method_id)
+                if not payment_method:
+                    return self._missing("payment_method", payment_method_id)
+                payment_method["customer"] = params.get("customer")
+                return 200, payment_method
+            case "GET", ["prices", price_id]:
+                return 200, self._price(price_id)
+            case "POST", ["subscriptions"]:
+                customer_id = params.get("customer", "")
+                if customer_id not in objects:
+                    return self._missing("customer", customer_id)
+                price = self._price(params.get("items[0][price]", ""))
+                return 200, self._store(
+                    {
+                        "id": _new_id("sub"),
+                        "object": "subscription",
+                        "customer": customer_id,
+                        "status": "active",
+                        "items": {
+                            "object": "list",
+                            "data": [
+                                {
+                                    "id": _new_id("si"),
+                                    "object": "subscription_item",
+                                    "price": price,
+                                }
+                            ],
+                        },
+                        "latest_invoice": _new_id("in"),
+                    }
+                )
+            case _:
+                return _error(
+                    404,
+                    "invalid_request_error",
+                    f"Unrecognized request URL ({method}: {self.path})",
+                )
+
+    def _store(self, stripe_object: dict) -> dict:
+        self.state.objects[stripe_object["id"]] = stripe_object
+        return stripe_object
+
+    def _price(self, price_id: str) -> dict:
+        return {
+            "id": price_id,
+            "object": "price",
+            "unit_amount": self.state.config.unit_amount,
+            "currency": "usd",
+        }
+
+    def _missing(self, resource: str, object_id: Optional[str]):
+        return _error(
+            404,
+            "invalid_request_error",
+            f"No such {resource}: '{object_id}'",
+            code="resource_missing",
+        )
+
+    def _send(self, status: int, body: dict):
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("Request-Id", _new_id("req"))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@dataclass
+class StripeStandIn:
+    """
+    Local HTTP stand-in for the Stripe endpoints used by
+    StripePaymentProcessor, for load and latency testing.
+
+    Point a processor at it with create_stripe_client(api_base=server.url)
+    or the STRIPE_API_BASE environment variable.
+    """
+
+    config: StandInConfig = field(default_factory=StandInConfig)
+    host: str = "127.0.0.1"
+    port: int = 0
+    _server: Optional[ThreadingHTTPServer] = field(default=None, init=False)
+    _state: Optional[_StandInState] = field(default=None, init=False)
+    _thread: Optional[threading.Thread] = field(default=None, init=False)
+
+    @property
+    def url(self) -> str:
+        if not self._server:
+            raise RuntimeError("El servidor no ha sido iniciado")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_counts(self) -> dict[str, int]:
+        return dict(self._state.requests) if self._state else {}
+
+    def start(self) -> Self:
+        self._state = _StandInState(config=self.config)
+        handler = type(
+            "StandInHandler", (_StandInHandler,), {"state": self._state}
+        )
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name="stripe-standin",
+            daemon=True,
+        )
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self.start()
+        self._thread.join()  # type: ignore
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
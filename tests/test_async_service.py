@@ -0,0 +1,74 @@
+import asyncio
+
+import factory
+from async_service import AsyncPaymentService
+from commons import ContactInfo, CustomerData, PaymentData
+from listeners import ListenersManager
+from loggers import JsonLinesFormat, TransactionLogger
+from processors import (
+    AsyncPaymentProcessorAdapter,
+    LocalPaymentProcessor,
+    StripePaymentProcessor,
+)
+from validators import CustomerHandler
+
+
+class RecordingNotifier:
+    def __init__(self):
+        self.notified: list[str] = []
+
+    async def send_confirmation(self, customer_data: CustomerData):
+        self.notified.append(customer_data.name)
+
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+payment = PaymentData(amount=100, source="tok")
+
+
+def make_service(tmp_path, notifier) -> AsyncPaymentService:
+    processor = AsyncPaymentProcessorAdapter(wrapped=LocalPaymentProcessor())
+    return AsyncPaymentService(
+        payment_processor=processor,
+        notifier=notifier,
+        validators=CustomerHandler(),
+        logger=TransactionLogger(
+            path=str(tmp_path / "transactions.log"),
+            record_format=JsonLinesFormat(),
+        ),
+        listeners=ListenersManager(),
+        refund_processor=processor,
+    )
+
+
+def test_transaction_is_confirmed_and_logged(tmp_path):
+    notifier = RecordingNotifier()
+    service = make_service(tmp_path, notifier)
+
+    response = asyncio.run(service.process_transaction(customer, payment))
+
+    assert response.status == "success"
+    assert notifier.notified == ["Ana"]
+    [record] = service.logger.read_records()
+    assert record.transaction_id == response.transaction_id
+
+
+def test_refund_is_logged(tmp_path):
+    service = make_service(tmp_path, RecordingNotifier())
+
+    response = asyncio.run(service.process_refund("ch_1"))
+
+    assert response.status == "success"
+    assert len(list(service.logger.read_records())) == 1
+
+
+def test_stripe_falls_back_to_the_adapter_without_httpx(monkeypatch):
+    monkeypatch.setattr(factory, "async_http_available", lambda: False)
+
+    processor = factory.PaymentProcessorFactory.create_async_payment_processor(
+        payment
+    )
+
+    assert isinstance(processor, AsyncPaymentProcessorAdapter)
+    assert isinstance(processor.wrapped, StripePaymentProcessor)
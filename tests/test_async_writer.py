@@ -0,0 +1,50 @@
+import threading
+
+from commons import ContactInfo, CustomerData, PaymentData, PaymentResponse
+from loggers import AsyncTransactionLogger, JsonLinesFormat, TransactionLogger
+
+
+class FailingOnceSink(TransactionLogger):
+    def __init__(self, path: str):
+        super().__init__(path=path, record_format=JsonLinesFormat())
+        self.failed = False
+
+    def _write(self, records):
+        if not self.failed:
+            self.failed = True
+            raise ValueError("sink rejected the batch")
+        super()._write(records)
+
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+payment = PaymentData(amount=100, source="tok")
+response = PaymentResponse(
+    status="succeeded", amount=100, transaction_id="ch_1", message="ok"
+)
+
+
+def test_writer_survives_sink_errors(tmp_path):
+    path = str(tmp_path / "transactions.log")
+    logger = AsyncTransactionLogger(
+        path=path,
+        record_format=JsonLinesFormat(),
+        sink=FailingOnceSink(path),
+        max_queue=1,
+        max_batch=1,
+    )
+
+    def log_all():
+        for _ in range(6):
+            logger.log_transaction(customer, payment, response)
+
+    caller = threading.Thread(target=log_all)
+    caller.start()
+    caller.join(timeout=5)
+
+    assert not caller.is_alive()
+    logger.flush()
+    assert logger.stats.write_errors == 1
+    assert logger.stats.written == 5
+    logger.close()
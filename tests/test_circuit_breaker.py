@@ -0,0 +1,197 @@
+from stripe.error import APIConnectionError  # type: ignore
+
+from commons import (
+    BatchResponse,
+    ContactInfo,
+    CustomerData,
+    PaymentData,
+    PaymentResponse,
+)
+from processors import (
+    CircuitBreaker,
+    CircuitBreakerProcessor,
+    OfflinePaymentProcessor,
+)
+
+
+class FakeProcessor:
+    def __init__(self, crash_after=None):
+        self.charges = 0
+        self.crash_after = crash_after
+
+    def process_transaction(self, customer_data, payment_data):
+        if self.charges == self.crash_after:
+            raise KeyboardInterrupt
+        self.charges += 1
+        return PaymentResponse(
+            status="succeeded",
+            amount=payment_data.amount,
+            transaction_id="ch_1",
+            message="Payment successful",
+        )
+
+    def refund_payment(self, transaction_id):
+        raise APIConnectionError("connection reset")
+
+    def setup_recurring_payment(self, customer_data, payment_data):
+        raise ValueError("Email required for subscriptions")
+
+
+def make_processor(
+    queue_path=None, max_queued=10_000, **breaker_options
+) -> CircuitBreakerProcessor:
+    return CircuitBreakerProcessor(
+        wrapped=FakeProcessor(),
+        breaker=CircuitBreaker(name="stripe", **breaker_options),
+        fallback=OfflinePaymentProcessor(),
+        max_queued=max_queued,
+        queue_path=queue_path,
+    )
+
+
+def open_breaker(processor: CircuitBreakerProcessor):
+    for _ in range(processor.breaker.min_calls):
+        try:
+            processor.refund_payment("ch_1")
+        except APIConnectionError:
+            pass
+
+
+customer = CustomerData(name="Ana", contact_info=ContactInfo(phone="555"))
+payment = PaymentData(amount=100, source="tok_visa")
+
+
+def test_caller_errors_do_not_open_the_breaker():
+    processor = make_processor(min_calls=10)
+
+    for _ in range(20):
+        try:
+            processor.setup_recurring_payment(customer, payment)
+        except ValueError:
+            pass
+
+    assert processor.breaker.state == "closed"
+    response = processor.process_transaction(customer, payment)
+    assert response.status == "succeeded"
+    assert processor.wrapped.charges == 1
+    assert not processor.queued
+
+
+def test_provider_errors_open_the_breaker():
+    processor = make_processor(min_calls=10)
+
+    for _ in range(10):
+        try:
+            processor.refund_payment("ch_1")
+        except APIConnectionError:
+            pass
+
+    assert processor.breaker.state == "open"
+    response = processor.process_transaction(customer, payment)
+    assert response.status == "queued"
+    assert processor.wrapped.charges == 0
+
+
+def test_caller_errors_give_back_half_open_trial_calls():
+    processor = make_processor(
+        min_calls=1, open_duration=0, half_open_max_calls=1
+    )
+    try:
+        processor.refund_payment("ch_1")
+    except APIConnectionError:
+        pass
+    assert processor.breaker.state == "open"
+
+    try:
+        processor.setup_recurring_payment(customer, payment)
+    except ValueError:
+        pass
+    response = processor.process_transaction(customer, payment)
+
+    assert response.status == "succeeded"
+    assert processor.breaker.state == "closed"
+
+
+def test_queued_payments_survive_a_restart(tmp_path):
+    queue_path = tmp_path / "queued.jsonl"
+    processor = make_processor(queue_path=queue_path, min_calls=1)
+    open_breaker(processor)
+    processor.process_transaction(customer, payment)
+    processor.process_transaction(customer, payment)
+    with open(queue_path, "a") as queue_file:
+        queue_file.write('{"customer_data": {"na')
+
+    restarted = make_processor(queue_path=queue_path)
+
+    assert list(restarted.queued) == [(customer, payment)] * 2
+    replayed = restarted.replay_queued()
+    assert [response.status for _, _, response in replayed] == [
+        "succeeded",
+        "succeeded",
+    ]
+    assert restarted.wrapped.charges == 2
+    assert not make_processor(queue_path=queue_path).queued
+
+
+def test_replay_keeps_payments_not_yet_charged(tmp_path):
+    queue_path = tmp_path / "queued.jsonl"
+    processor = make_processor(queue_path=queue_path, min_calls=1)
+    open_breaker(processor)
+    for amount in (100, 200, 300):
+        processor.process_transaction(
+            customer, PaymentData(amount=amount, source="tok_visa")
+        )
+
+    crashing = make_processor(queue_path=queue_path)
+    crashing.wrapped = FakeProcessor(crash_after=1)
+    try:
+        crashing.replay_queued()
+    except KeyboardInterrupt:
+        pass
+
+    restarted = make_processor(queue_path=queue_path)
+    replayed = restarted.replay_queued()
+    assert [payment.amount for _, payment, _ in replayed] == [200, 300]
+    assert not restarted.queued
+
+
+def test_file_queue_is_shared_by_every_processor_using_it(tmp_path):
+    queue_path = tmp_path / "queued.jsonl"
+    first = make_processor(queue_path=queue_path, max_queued=2, min_calls=1)
+    second = make_processor(queue_path=queue_path, max_queued=2, min_calls=1)
+    open_breaker(first)
+    open_breaker(second)
+
+    statuses = [
+        processor.process_transaction(customer, payment).status
+        for processor in (first, second, first)
+    ]
+    replayer = make_processor(queue_path=queue_path)
+    replayed = replayer.replay_queued()
+
+    assert statuses == ["queued", "queued", "failed"]
+    assert len(replayed) == 2
+    assert make_processor(queue_path=queue_path).replay_queued() == []
+
+
+def test_payments_beyond_max_queued_are_rejected():
+    processor = make_processor(max_queued=1, min_calls=1)
+    open_breaker(processor)
+
+    first = processor.process_transaction(customer, payment)
+    second = processor.process_transaction(customer, payment)
+
+    assert first.status == "queued"
+    assert second.status == "failed"
+    assert len(processor.queued) == 1
+
+
+def test_batch_counts_queued_payments_apart_from_charges():
+    batch = BatchResponse()
+    batch.add(
+        PaymentResponse(status="succeeded", amount=100, message="charged")
+    )
+    batch.add(PaymentResponse(status="queued", amount=50, message="queued"))
+
+    assert (batch.succeeded, batch.queued, batch.failed) == (1, 1, 0)
+    assert batch.amount_processed == 100
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData, PaymentResponse
+from idempotency_service import (
+    IdempotencyKeyMismatch,
+    PaymentServiceIdempotency,
+)
+
+
+class SlowService:
+    def __init__(self):
+        self.charges = 0
+        self.release = threading.Event()
+
+    def process_transaction(self, customer_data, payment_data):
+        self.charges += 1
+        self.release.wait(timeout=5)
+        return PaymentResponse(
+            status="succeeded",
+            amount=payment_data.amount,
+            transaction_id=f"ch_{self.charges}",
+            message="Payment successful",
+        )
+
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+payment = PaymentData(amount=100, source="tok")
+
+
+def test_concurrent_payments_with_one_key_are_charged_once():
+    wrapped = SlowService()
+    service = PaymentServiceIdempotency(wrapped=wrapped)  # type: ignore
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [
+            executor.submit(
+                service.process_transaction, customer, payment, "order-1"
+            )
+            for _ in range(4)
+        ]
+        wrapped.release.set()
+        responses = [future.result(timeout=5) for future in futures]
+
+    assert wrapped.charges == 1
+    assert {response.transaction_id for response in responses} == {"ch_1"}
+
+
+def test_completed_response_is_reused_for_its_key():
+    wrapped = SlowService()
+    wrapped.release.set()
+    service = PaymentServiceIdempotency(wrapped=wrapped)  # type: ignore
+
+    first = service.process_transaction(customer, payment, "order-1")
+    again = service.process_transaction(customer, payment, "order-1")
+
+    assert wrapped.charges == 1
+    assert again == first
+
+
+def test_key_reused_for_another_payment_is_rejected():
+    wrapped = SlowService()
+    wrapped.release.set()
+    service = PaymentServiceIdempotency(wrapped=wrapped)  # type: ignore
+    service.process_transaction(customer, payment, "order-1")
+
+    with pytest.raises(IdempotencyKeyMismatch):
+        service.process_transaction(
+            customer, PaymentData(amount=200, source="tok"), "order-1"
+        )
+    assert wrapped.charges == 1
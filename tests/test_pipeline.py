@@ -0,0 +1,60 @@
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData
+from listeners import ListenersManager
+from loggers import JsonLinesFormat, TransactionLogger
+from processors import LocalPaymentProcessor
+from service import PaymentService
+from validators import CustomerHandler
+
+
+class SilentNotifier:
+    def send_confirmation(self, customer_data: CustomerData):
+        pass
+
+
+def make_service(tmp_path) -> PaymentService:
+    return PaymentService(
+        payment_processor=LocalPaymentProcessor(),
+        notifier=SilentNotifier(),
+        validators=CustomerHandler(),
+        logger=TransactionLogger(
+            path=str(tmp_path / "transactions.log"),
+            record_format=JsonLinesFormat(),
+        ),
+        listeners=ListenersManager(),
+    )
+
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+payment = PaymentData(amount=100, source="tok")
+
+
+def test_payments_run_through_every_stage(tmp_path):
+    service = make_service(tmp_path)
+
+    with service.create_pipeline() as pipeline:
+        futures = [pipeline.submit(customer, payment) for _ in range(5)]
+        responses = [future.result(timeout=5) for future in futures]
+
+    assert [response.status for response in responses] == ["success"] * 5
+    assert len(list(service.logger.read_records())) == 5
+
+
+def test_invalid_payments_fail_their_future(tmp_path):
+    invalid = CustomerData(name="Ana", contact_info=ContactInfo())
+
+    with make_service(tmp_path).create_pipeline() as pipeline:
+        future = pipeline.submit(invalid, payment)
+
+        assert future.exception(timeout=5) is not None
+
+
+def test_submit_after_close_is_rejected(tmp_path):
+    pipeline = make_service(tmp_path).create_pipeline().start()
+    pipeline.close()
+
+    with pytest.raises(RuntimeError):
+        pipeline.submit(customer, payment)
@@ -0,0 +1,48 @@
+import uuid
+
+import pytest
+
+from processors.rate_limiter import (
+    RateLimiter,
+    RateLimitExceeded,
+    SharedTokenBucket,
+    TokenBucket,
+    rates_from_env,
+)
+
+
+def test_token_bucket_allows_a_burst_then_waits():
+    bucket = TokenBucket(rate=10, burst=2)
+
+    assert bucket.reserve(max_wait=0) == 0
+    assert bucket.reserve(max_wait=0) == 0
+    assert bucket.reserve(max_wait=0) is None
+    assert bucket.reserve(max_wait=1) == pytest.approx(0.1, abs=0.02)
+
+
+def test_shared_token_buckets_draw_from_the_same_tokens():
+    name = f"test-bucket-{uuid.uuid4().hex[:8]}"
+    first = SharedTokenBucket(name=name, rate=1, burst=1)
+    second = SharedTokenBucket(name=name, rate=1, burst=1)
+    try:
+        assert first.reserve(max_wait=0) == 0
+        assert second.reserve(max_wait=0) is None
+    finally:
+        first.unlink()
+
+
+def test_shed_mode_rejects_calls_over_the_rate():
+    limiter = RateLimiter(rates={"charges": 1}, mode="shed")
+
+    limiter.acquire("charges")
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire("charges")
+    limiter.acquire("refunds")
+
+
+def test_rates_are_opt_in(monkeypatch):
+    monkeypatch.delenv("STRIPE_RATE_LIMIT", raising=False)
+    assert rates_from_env() == {}
+
+    monkeypatch.setenv("STRIPE_RATE_LIMIT", "50")
+    assert set(rates_from_env().values()) == {50.0}
@@ -0,0 +1,137 @@
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData
+from listeners import ListenersManager
+from loggers import JsonLinesFormat, TransactionLogger
+from processors import LocalPaymentProcessor
+from service import PaymentService
+from validators import CustomerHandler
+
+
+class FlakyNotifier:
+    def __init__(self, failing_call: int):
+        self.calls = 0
+        self.failing_call = failing_call
+
+    def send_confirmation(self, customer_data: CustomerData):
+        self.calls += 1
+        if self.calls == self.failing_call:
+            raise ConnectionError("SMTP server unavailable")
+
+
+class CrashingProcessor(LocalPaymentProcessor):
+    def __init__(self, crash_after: int):
+        self.charges = 0
+        self.crash_after = crash_after
+
+    def process_transaction(self, customer_data, payment_data):
+        if self.charges == self.crash_after:
+            raise KeyboardInterrupt
+        self.charges += 1
+        return super().process_transaction(customer_data, payment_data)
+
+
+class CountingRefundProcessor(LocalPaymentProcessor):
+    def __init__(self, crash_on=None):
+        self.refunded: list[str] = []
+        self.crash_on = crash_on
+
+    def refund_payment(self, transaction_id: str):
+        if transaction_id == self.crash_on:
+            raise KeyboardInterrupt
+        self.refunded.append(transaction_id)
+        return super().refund_payment(transaction_id)
+
+
+def make_service(tmp_path, processor=None, notifier=None) -> PaymentService:
+    return PaymentService(
+        payment_processor=processor or LocalPaymentProcessor(),
+        notifier=notifier or FlakyNotifier(failing_call=0),
+        validators=CustomerHandler(),
+        logger=TransactionLogger(
+            path=str(tmp_path / "transactions.log"),
+            record_format=JsonLinesFormat(),
+        ),
+        listeners=ListenersManager(),
+        refund_processor=processor,
+    )
+
+
+def payments(count: int) -> list[tuple[CustomerData, PaymentData]]:
+    customer = CustomerData(
+        name="Ana", contact_info=ContactInfo(email="ana@example.com")
+    )
+    return [(customer, PaymentData(amount=100, source="tok"))] * count
+
+
+def test_batch_survives_notifier_errors(tmp_path):
+    service = make_service(tmp_path, notifier=FlakyNotifier(failing_call=3))
+
+    batch = service.process_batch(payments(5))
+
+    assert (batch.total, batch.succeeded, batch.failed) == (5, 5, 0)
+    assert len(list(service.logger.read_records())) == 5
+
+
+def test_batch_logs_charges_made_before_a_crash(tmp_path, monkeypatch):
+    monkeypatch.setattr(PaymentService, "batch_log_chunk_size", 2)
+    service = make_service(tmp_path, processor=CrashingProcessor(3))
+
+    with pytest.raises(KeyboardInterrupt):
+        service.process_batch(payments(5))
+
+    assert len(list(service.logger.read_records())) == 3
+
+
+def test_stream_skips_malformed_lines(tmp_path):
+    path = tmp_path / "payments.jsonl"
+    record = '{"name": "Ana", "email": "ana@example.com", "amount": 100, '
+    record += '"source": "tok"}\n'
+    path.write_text(record + '{"name": "Ana", "amount":\n' + record)
+    service = make_service(tmp_path)
+
+    responses = list(service.process_stream(path))
+
+    assert [response.status for response in responses] == [
+        "success",
+        "failed",
+        "success",
+    ]
+
+
+def test_refunds_duplicated_ids_once(tmp_path):
+    processor = CountingRefundProcessor()
+    service = make_service(tmp_path, processor=processor)
+
+    batch = service.process_refunds(["ch_1", "ch_1", "ch_2", "ch_1"], 8, 2)
+
+    assert sorted(processor.refunded) == ["ch_1", "ch_2"]
+    assert batch.total == 4
+    assert len(list(service.logger.read_records())) == 2
+
+
+def test_stream_logs_charges_whose_confirmation_fails(tmp_path):
+    service = make_service(tmp_path, notifier=FlakyNotifier(failing_call=1))
+
+    responses = list(service.process_stream(payments(2)))
+
+    assert [response.status for response in responses] == ["success"] * 2
+    assert all(response.transaction_id for response in responses)
+    assert len(list(service.logger.read_records())) == 2
+
+
+def test_refunds_resume_after_the_last_completed_refund(tmp_path):
+    checkpoint = tmp_path / "refunds.jsonl"
+    ids = [f"ch_{number}" for number in range(5)]
+    crashing = make_service(
+        tmp_path, processor=CountingRefundProcessor(crash_on="ch_2")
+    )
+    with pytest.raises(KeyboardInterrupt):
+        crashing.process_refunds(ids, 1, checkpoint_path=checkpoint)
+
+    processor = CountingRefundProcessor()
+    service = make_service(tmp_path, processor=processor)
+    batch = service.process_refunds(ids, 1, checkpoint_path=checkpoint)
+
+    assert processor.refunded == ["ch_2", "ch_3", "ch_4"]
+    assert batch.total == 5
@@ -0,0 +1,44 @@
+import os
+import signal
+import time
+
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData
+from sharded_runner import ShardedPaymentRunner
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+payment = PaymentData(amount=100, source="tok")
+
+
+@pytest.fixture
+def runner():
+    runner = ShardedPaymentRunner(workers=1, health_check_interval=0.1)
+    yield runner.start()
+    runner.close(timeout=5)
+
+
+def test_pending_payments_fail_when_a_worker_dies(runner):
+    worker = runner._processes[0]
+    os.kill(worker.pid, signal.SIGSTOP)
+    future = runner.submit(customer, payment)
+
+    os.kill(worker.pid, signal.SIGKILL)
+
+    assert isinstance(future.exception(timeout=5), RuntimeError)
+    assert isinstance(
+        runner.submit(customer, payment).exception(timeout=5), RuntimeError
+    )
+
+
+def test_close_kills_workers_past_the_timeout(runner):
+    os.kill(runner._processes[0].pid, signal.SIGSTOP)
+    future = runner.submit(customer, payment)
+
+    started = time.monotonic()
+    runner.close(timeout=0.5)
+
+    assert time.monotonic() - started < 5
+    assert isinstance(future.exception(timeout=5), RuntimeError)
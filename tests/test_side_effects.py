@@ -0,0 +1,102 @@
+import threading
+
+from commons import ContactInfo, CustomerData, PaymentData
+from listeners import ListenersManager
+from loggers import JsonLinesFormat, TransactionLogger
+from processors import LocalPaymentProcessor
+from service import PaymentService
+from side_effects import DeferredSideEffects
+from validators import CustomerHandler
+
+
+class FlakyAction:
+    def __init__(self, failures: int):
+        self.calls = 0
+        self.failures = failures
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise ConnectionError("SMTP server unavailable")
+
+
+class SilentNotifier:
+    def send_confirmation(self, customer_data: CustomerData):
+        pass
+
+
+class RecordingListener:
+    def __init__(self, failures: int = 0):
+        self.action = FlakyAction(failures)
+
+    def notify(self, event):
+        self.action()
+
+
+def test_retries_do_not_hold_back_other_tasks():
+    side_effects = DeferredSideEffects(retry_delay=1.0).start()
+    finished = threading.Event()
+
+    side_effects.submit("notifier", FlakyAction(failures=1))
+    side_effects.submit("logger", finished.set)
+
+    assert finished.wait(timeout=0.5)
+    assert side_effects.pending() == 1
+    side_effects.close()
+    assert side_effects.pending() == 0
+    assert not side_effects.failed
+
+
+def test_tasks_are_failed_after_max_attempts():
+    side_effects = DeferredSideEffects(max_attempts=2, retry_delay=0.01)
+    action = FlakyAction(failures=5)
+
+    side_effects.submit("notifier", action)
+    side_effects.close()
+
+    assert action.calls == 2
+    assert [task.name for task in side_effects.failed] == ["notifier"]
+
+
+def test_submit_waits_while_max_pending_is_reached():
+    side_effects = DeferredSideEffects(max_pending=1).start()
+    release = threading.Event()
+    side_effects.submit("logger", release.wait)
+    submitted = threading.Event()
+
+    def submit():
+        side_effects.submit("logger", lambda: None)
+        submitted.set()
+
+    threading.Thread(target=submit).start()
+
+    assert not submitted.wait(timeout=0.2)
+    release.set()
+    assert submitted.wait(timeout=1)
+    side_effects.close()
+
+
+def test_listeners_are_notified_once_when_another_fails(tmp_path):
+    flaky, steady = RecordingListener(failures=1), RecordingListener()
+    side_effects = DeferredSideEffects(retry_delay=0.01)
+    service = PaymentService(
+        payment_processor=LocalPaymentProcessor(),
+        notifier=SilentNotifier(),
+        validators=CustomerHandler(),
+        logger=TransactionLogger(
+            path=str(tmp_path / "transactions.log"),
+            record_format=JsonLinesFormat(),
+        ),
+        listeners=ListenersManager(listeners=[steady, flaky]),
+        side_effects=side_effects,
+    )
+
+    service.process_transaction(
+        CustomerData(
+            name="Ana", contact_info=ContactInfo(email="ana@example.com")
+        ),
+        PaymentData(amount=100, source="tok"),
+    )
+    side_effects.close()
+
+    assert (flaky.action.calls, steady.action.calls) == (2, 1)
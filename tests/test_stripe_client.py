@@ -0,0 +1,20 @@
+import asyncio
+
+from processors import stripe_client
+from processors.stripe_client import get_default_stripe_client
+
+
+def test_async_default_client_is_per_event_loop(monkeypatch):
+    monkeypatch.setattr(stripe_client, "create_async_stripe_client", object)
+
+    async def default_clients():
+        return (
+            get_default_stripe_client(asynchronous=True),
+            get_default_stripe_client(asynchronous=True),
+        )
+
+    first, again = asyncio.run(default_clients())
+    second, _ = asyncio.run(default_clients())
+
+    assert first is again
+    assert first is not second
@@ -0,0 +1,54 @@
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData
+from processors import (
+    CustomerCache,
+    PriceCache,
+    RateLimiter,
+    StripePaymentProcessor,
+    create_stripe_client,
+)
+from stripe_standin import StripeStandIn
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    monkeypatch.setenv("STRIPE_PRICE_ID", "price_monthly")
+    with StripeStandIn() as server:
+        yield server
+
+
+def make_processor(standin: StripeStandIn) -> StripePaymentProcessor:
+    return StripePaymentProcessor(
+        client=create_stripe_client(api_key="sk_test", api_base=standin.url),
+        customer_cache=CustomerCache(),
+        price_cache=PriceCache(),
+        rate_limiter=RateLimiter(rates={}),
+    )
+
+
+def test_cached_customer_default_payment_method_is_not_trusted(standin):
+    processor = make_processor(standin)
+    customer = processor.stripe_client.customers.create(
+        params={"name": "Ana", "email": "ana@example.com"}
+    )
+    customer_data = CustomerData(
+        name="Ana",
+        contact_info=ContactInfo(email="ana@example.com"),
+        customer_id=customer.id,
+    )
+
+    processor.setup_recurring_payment(
+        customer_data, PaymentData(amount=100, source="pm_1")
+    )
+    processor.stripe_client.customers.update(
+        customer.id,
+        params={"invoice_settings": {"default_payment_method": "pm_2"}},
+    )
+    response = processor.setup_recurring_payment(
+        customer_data, PaymentData(amount=100, source="pm_1")
+    )
+
+    assert response.status == "active"
+    customer = processor.stripe_client.customers.retrieve(customer.id)
+    assert customer.invoice_settings.default_payment_method == "pm_1"
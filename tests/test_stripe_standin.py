@@ -0,0 +1,35 @@
+import pytest
+import stripe
+
+from processors import create_stripe_client
+from stripe_standin import StandInConfig, StripeStandIn
+
+
+def test_objects_beyond_max_objects_are_forgotten():
+    with StripeStandIn(config=StandInConfig(max_objects=2)) as server:
+        client = create_stripe_client(api_key="sk_test", api_base=server.url)
+        customers = [
+            client.customers.create(params={"name": name})
+            for name in ("Ana", "Luis", "Eva")
+        ]
+
+        with pytest.raises(stripe.InvalidRequestError):
+            client.customers.retrieve(customers[0].id)
+        assert client.customers.retrieve(customers[2].id).name == "Eva"
+
+
+def test_idempotent_requests_replay_the_first_response():
+    config = StandInConfig(max_idempotent_responses=1)
+    with StripeStandIn(config=config) as server:
+        client = create_stripe_client(api_key="sk_test", api_base=server.url)
+
+        def charge(key: str):
+            return client.charges.create(
+                params={"amount": 100, "currency": "usd", "source": "tok"},
+                options={"idempotency_key": key},
+            )
+
+        first = charge("order-1")
+        assert charge("order-1").id == first.id
+        charge("order-2")
+        assert charge("order-1").id != first.id
@@ -0,0 +1,89 @@
+import io
+
+import pytest
+
+from commons import ContactInfo, CustomerData, PaymentData, PaymentResponse
+from loggers import (
+    BinaryFormat,
+    JsonLinesFormat,
+    SegmentedTransactionLogger,
+    TransactionIndex,
+    TransactionLogger,
+)
+from loggers import segmented
+
+customer = CustomerData(
+    name="Ana", contact_info=ContactInfo(email="ana@example.com")
+)
+
+
+def log_payments(logger: TransactionLogger, ids: range):
+    logger.log_transactions(
+        (
+            customer,
+            PaymentData(amount=number, source="tok"),
+            PaymentResponse(
+                status="succeeded",
+                amount=number,
+                transaction_id=f"ch_{number}",
+                message="Payment successful",
+            ),
+        )
+        for number in ids
+    )
+
+
+class ChunkedReads(io.BytesIO):
+    """Fails when asked for the rest of the file at once."""
+
+    def read(self, size=-1):
+        assert size is not None and size >= 0
+        return super().read(size)
+
+
+def open_segmented(tmp_path) -> SegmentedTransactionLogger:
+    return SegmentedTransactionLogger(
+        path=str(tmp_path / "transactions.log"),
+        record_format=JsonLinesFormat(),
+        index=TransactionIndex(str(tmp_path / "transactions.idx")),
+    )
+
+
+def test_text_format_cannot_be_indexed(tmp_path):
+    with pytest.raises(ValueError):
+        TransactionLogger(
+            path=str(tmp_path / "transactions.log"),
+            index=TransactionIndex(str(tmp_path / "transactions.idx")),
+        )
+
+
+def test_finds_records_in_compressed_segments(tmp_path, monkeypatch):
+    monkeypatch.setattr(segmented, "COMPRESSED_BLOCK_BYTES", 256)
+    logger = open_segmented(tmp_path)
+    log_payments(logger, range(100))
+    logger.rotate()
+    log_payments(logger, range(100, 110))
+    logger.close()
+    logger = open_segmented(tmp_path)
+
+    segment = logger.segment_path(1)
+    assert not (tmp_path / segment).exists()
+    assert (tmp_path / f"{segment}.blocks").stat().st_size > 16
+    for number in (0, 57, 99, 105):
+        record = logger.find_transaction(f"ch_{number}")
+        assert record is not None and record.amount == number
+
+
+@pytest.mark.parametrize("record_format", [JsonLinesFormat(), BinaryFormat()])
+def test_records_are_read_back_one_by_one(tmp_path, record_format):
+    logger = TransactionLogger(
+        path=str(tmp_path / "transactions.log"), record_format=record_format
+    )
+    log_payments(logger, range(3))
+
+    records = list(logger.read_records())
+    with open(logger.path, "rb") as log_file:
+        streamed = list(record_format.read(ChunkedReads(log_file.read())))
+
+    assert [record.amount for record in records] == [0, 1, 2]
+    assert streamed == records